@@ -0,0 +1,201 @@
+"""
+Strategy Analytics - Incrementally cached performance metrics over the trade history
+"""
+
+import logging
+import threading
+from typing import Dict, List, Optional, Any, Tuple
+
+import numpy as np
+
+from database import DB_PATH, get_connection
+from trade_store import TRADE_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+CALIBRATION_BINS = 10
+
+class MetricAccumulator:
+    """Running statistics for one group of trades, updated batch by batch"""
+
+    def __init__(self):
+        self.trades = 0
+        self.wins = 0
+        self.losses = 0
+        self.gross_win = 0.0
+        self.gross_loss = 0.0
+        self.sum_return = 0.0
+        self.sum_return_sq = 0.0
+        self.sum_downside_sq = 0.0
+        self.equity = 0.0
+        self.peak_equity = 0.0
+        self.max_drawdown = 0.0
+        self.exposure_seconds = 0.0
+        # Net position and last trade time per pair, for exposure tracking
+        self.positions: Dict[str, Tuple[float, Optional[int]]] = {}
+        self.confidence_trades = np.zeros(CALIBRATION_BINS, dtype=np.int64)
+        self.confidence_wins = np.zeros(CALIBRATION_BINS, dtype=np.int64)
+        self.confidence_sum = np.zeros(CALIBRATION_BINS)
+        self.brier_sum = 0.0
+
+    def update(self, batch: Dict[str, np.ndarray]):
+        """Fold a time-ordered batch of trades into the running statistics"""
+        profit = batch['profit']
+        won = profit > 0
+        lost = profit < 0
+
+        self.trades += len(profit)
+        self.wins += int(won.sum())
+        self.losses += int(lost.sum())
+        self.gross_win += float(profit[won].sum())
+        self.gross_loss += float(profit[lost].sum())
+
+        returns = batch['return']
+        self.sum_return += float(returns.sum())
+        self.sum_return_sq += float(np.square(returns).sum())
+        self.sum_downside_sq += float(np.square(np.minimum(returns, 0)).sum())
+
+        # Drawdown continues from the previous equity curve
+        equity = self.equity + np.cumsum(profit)
+        peaks = np.maximum.accumulate(np.maximum(equity, self.peak_equity))
+        self.max_drawdown = max(self.max_drawdown, float((peaks - equity).max()))
+        self.equity = float(equity[-1])
+        self.peak_equity = float(peaks[-1])
+
+        self._update_exposure(batch)
+        self._update_calibration(batch['ai_confidence'], won)
+
+    def _update_exposure(self, batch: Dict[str, np.ndarray]):
+        pairs, inverse = np.unique(batch['pair'], return_inverse=True)
+        for index, pair in enumerate(pairs):
+            mask = inverse == index
+            times = batch['time'][mask]
+            position, last_time = self.positions.get(pair, (0.0, None))
+
+            positions_after = position + np.cumsum(batch['signed_amount'][mask])
+            positions_before = np.concatenate(([position], positions_after[:-1]))
+            durations = np.maximum(np.diff(times, prepend=times[0] if last_time is None else last_time), 0)
+            self.exposure_seconds += float(durations[~np.isclose(positions_before, 0)].sum())
+
+            self.positions[pair] = (float(positions_after[-1]), int(times[-1]))
+
+    def _update_calibration(self, confidence: np.ndarray, won: np.ndarray):
+        known = ~np.isnan(confidence)
+        confidence = confidence[known]
+        won = won[known]
+        if not len(confidence):
+            return
+
+        bins = np.clip((confidence * CALIBRATION_BINS).astype(np.int64), 0, CALIBRATION_BINS - 1)
+        self.confidence_trades += np.bincount(bins, minlength=CALIBRATION_BINS)
+        self.confidence_wins += np.bincount(bins, weights=won, minlength=CALIBRATION_BINS).astype(np.int64)
+        self.confidence_sum += np.bincount(bins, weights=confidence, minlength=CALIBRATION_BINS)
+        self.brier_sum += float(np.square(confidence - won).sum())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Derive the reported metrics from the running statistics"""
+        n = self.trades
+        mean_return = self.sum_return / n if n else 0.0
+        variance = self.sum_return_sq / n - mean_return ** 2 if n else 0.0
+        std_return = float(np.sqrt(max(variance, 0.0)))
+        downside_dev = float(np.sqrt(self.sum_downside_sq / n)) if n else 0.0
+        calibrated = int(self.confidence_trades.sum())
+
+        return {
+            "trades": n,
+            "winRate": self.wins / n if n else 0.0,
+            "averageWin": self.gross_win / self.wins if self.wins else 0.0,
+            "averageLoss": self.gross_loss / self.losses if self.losses else 0.0,
+            "totalProfit": self.equity,
+            "maxDrawdown": self.max_drawdown,
+            # Per-trade ratios on return over notional, not annualised
+            "sharpe": mean_return / std_return if std_return else 0.0,
+            "sortino": mean_return / downside_dev if downside_dev else 0.0,
+            "exposureSeconds": self.exposure_seconds,
+            "aiCalibration": {
+                "brierScore": self.brier_sum / calibrated if calibrated else None,
+                "bins": [
+                    {
+                        "confidenceFrom": i / CALIBRATION_BINS,
+                        "confidenceTo": (i + 1) / CALIBRATION_BINS,
+                        "trades": int(self.confidence_trades[i]),
+                        "averageConfidence": float(self.confidence_sum[i] / self.confidence_trades[i]),
+                        "winRate": float(self.confidence_wins[i] / self.confidence_trades[i])
+                    } for i in range(CALIBRATION_BINS) if self.confidence_trades[i]
+                ]
+            }
+        }
+
+class StrategyAnalytics:
+    def __init__(self, trade_store, db_path: str = DB_PATH):
+        self.trade_store = trade_store
+        self.db_path = db_path
+        self.last_trade_id = 0
+        self.loaded = False
+        # Keyed by (bot_id or None for all bots, dimension, key)
+        self.groups: Dict[Tuple[Optional[int], str, str], MetricAccumulator] = {}
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Fold trades recorded since the last refresh into the cached metrics"""
+        with self._lock:
+            if not self.loaded:
+                # First load spans the archives as well as the hot table
+                rows = [tuple(trade[column] for column in TRADE_COLUMNS) for trade in self.trade_store.iter_trades()]
+                self.loaded = True
+            else:
+                conn = get_connection(self.db_path)
+                cursor = conn.cursor()
+                cursor.execute(f'''
+                    SELECT {', '.join(TRADE_COLUMNS)} FROM trades
+                    WHERE id > ?
+                    ORDER BY id
+                ''', (self.last_trade_id,))
+                rows = cursor.fetchall()
+                conn.close()
+
+            if rows:
+                self._ingest(rows)
+                logger.info(f"Analytics updated with {len(rows)} new trades")
+
+    def _ingest(self, rows: List[tuple]):
+        columns = dict(zip(TRADE_COLUMNS, zip(*rows)))
+        amount = np.array(columns['amount'], dtype=float)
+        price = np.array(columns['price'], dtype=float)
+        notional = amount * price
+        profit = np.array(columns['profit'], dtype=float)
+
+        batch = {
+            'pair': np.array(columns['pair'], dtype=object),
+            'profit': profit,
+            'return': np.divide(profit, notional, out=np.zeros_like(profit), where=notional != 0),
+            'signed_amount': np.where(np.array(columns['side']) == 'SELL', -amount, amount),
+            'time': np.array(columns['timestamp'], dtype='datetime64[s]').astype(np.int64),
+            'ai_confidence': np.array([np.nan if c is None else c for c in columns['ai_confidence']], dtype=float)
+        }
+        bot_ids = np.array(columns['bot_id'])
+        dimensions = {
+            'strategy': np.array([s or 'unknown' for s in columns['strategy']], dtype=object),
+            'pair': batch['pair']
+        }
+
+        for bot_id in [None] + [int(b) for b in np.unique(bot_ids)]:
+            bot_mask = np.ones(len(rows), dtype=bool) if bot_id is None else bot_ids == bot_id
+            for dimension, values in dimensions.items():
+                for key in np.unique(values[bot_mask]):
+                    mask = bot_mask & (values == key)
+                    group = self.groups.setdefault((bot_id, dimension, key), MetricAccumulator())
+                    group.update({name: column[mask] for name, column in batch.items()})
+
+        self.last_trade_id = max(self.last_trade_id, max(columns['id']))
+
+    def get_report(self, bot_id: Optional[int] = None) -> Dict[str, Any]:
+        """Refresh and report metrics per strategy and per pair"""
+        self.refresh()
+        report = {"byStrategy": {}, "byPair": {}}
+        with self._lock:
+            for (group_bot, dimension, key), group in self.groups.items():
+                if group_bot == bot_id:
+                    section = "byStrategy" if dimension == 'strategy' else "byPair"
+                    report[section][key] = group.to_dict()
+        return report
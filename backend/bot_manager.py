@@ -0,0 +1,275 @@
+"""
+Bot Manager - Runs many bot instances on one shared engine runtime
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Any
+
+from database import DB_PATH, get_connection
+from trading_engine import TradingEngine
+from profit_reserve import ProfitReserveManager
+from state_snapshot import StateSnapshot
+from config_store import ConfigStore
+from strategies import STRATEGY_REGISTRY, MarketInputs
+
+logger = logging.getLogger(__name__)
+
+class BotManager:
+    def __init__(self, ai_client, market_data, trade_store=None, snapshot: Optional[StateSnapshot] = None,
+                 config_store: Optional[ConfigStore] = None, journal=None, cycle_interval: float = 30,
+                 snapshot_interval: float = 10, max_concurrency: int = 50, db_path: str = DB_PATH):
+        # Market data and AI clients are shared, so their caches serve every bot
+        self.ai_client = ai_client
+        self.market_data = market_data
+        self.config_store = config_store or ConfigStore(db_path)
+        self.config_store.subscribe(self._on_config_change)
+        self.journal = journal
+        self.trade_store = trade_store
+        self.snapshot = snapshot
+        self.snapshot_interval = snapshot_interval
+        self._last_snapshot = 0.0
+        self.cycle_interval = cycle_interval
+        self.db_path = db_path
+        self.engines: Dict[int, TradingEngine] = {}
+        self.running_bots = set()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._loop_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._cycling = set()
+        # Running bots whose settings changed since their last cycle; setting _wake ends the sleep early
+        self._changed = set()
+        self._wake = asyncio.Event()
+
+    def load_bots(self):
+        """Create an engine for every bot stored in the database"""
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        self.config_store.load()
+
+        conn = get_connection(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('SELECT id, is_running FROM bot_status ORDER BY id')
+        rows = cursor.fetchall()
+        conn.close()
+
+        for bot_id, is_running in rows:
+            self._add_engine(bot_id)
+            if is_running:
+                self.running_bots.add(bot_id)
+
+        logger.info(f"Loaded {len(rows)} bots ({len(self.running_bots)} running)")
+
+    def _add_engine(self, bot_id: int) -> TradingEngine:
+        profit_manager = ProfitReserveManager(bot_id, self.db_path, self.config_store)
+        engine = TradingEngine(self.ai_client, self.market_data, profit_manager, bot_id, self.db_path, self.config_store)
+        engine.journal = self.journal
+        self.engines[bot_id] = engine
+        return engine
+
+    def get_engine(self, bot_id: int) -> Optional[TradingEngine]:
+        """Get the engine for a bot, if it exists"""
+        return self.engines.get(bot_id)
+
+    def create_bot(self, name: str, strategy: str = 'Trend Following', reserve_percentage: int = 10, balance: float = 10000) -> int:
+        """Create a new bot instance with its own strategy, reserve and balance"""
+        if strategy not in STRATEGY_REGISTRY:
+            raise ValueError(f"Unknown strategy: {strategy}")
+
+        conn = get_connection(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO bot_status (name, selected_strategy, reserve_percentage, balance)
+            VALUES (?, ?, ?, ?)
+        ''', (name, strategy, reserve_percentage, balance))
+        bot_id = cursor.lastrowid
+        conn.commit()
+        conn.close()
+
+        self.config_store.add_bot(bot_id, {'selectedStrategy': strategy, 'reservePercentage': reserve_percentage})
+        self._add_engine(bot_id)
+        logger.info(f"Created bot {bot_id} ({name}) with strategy {strategy}")
+        return bot_id
+
+    def list_bots(self) -> List[Dict[str, Any]]:
+        """List all bots with their headline figures"""
+        conn = get_connection(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT id, name, is_running, balance, total_profit, selected_strategy, reserve_percentage
+            FROM bot_status ORDER BY id
+        ''')
+        rows = cursor.fetchall()
+        conn.close()
+
+        return [
+            {
+                "id": row[0],
+                "name": row[1],
+                "isRunning": bool(row[2]),
+                "balance": row[3],
+                "totalProfit": row[4],
+                "selectedStrategy": row[5],
+                "reservePercentage": row[6]
+            } for row in rows
+        ]
+
+    def _set_running(self, bot_id: int, running: bool):
+        conn = get_connection(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('UPDATE bot_status SET is_running = ? WHERE id = ?', (running, bot_id))
+        conn.commit()
+        conn.close()
+
+    def start_bot(self, bot_id: int) -> bool:
+        """Mark a bot as running and make sure the scheduler is active"""
+        if bot_id in self.running_bots:
+            return False
+
+        self._set_running(bot_id, True)
+        self.running_bots.add(bot_id)
+        self.ensure_scheduler()
+        return True
+
+    def stop_bot(self, bot_id: int):
+        """Stop scheduling cycles for a bot"""
+        self._set_running(bot_id, False)
+        self.running_bots.discard(bot_id)
+
+    def _on_config_change(self, bot_id: int, config: Dict[str, Any]):
+        # Settings may change on an API thread; hop onto the engine loop
+        if self._loop and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._apply_config, bot_id, config)
+        else:
+            self._apply_config(bot_id, config)
+
+    def _apply_config(self, bot_id: int, config: Dict[str, Any]):
+        engine = self.engines.get(bot_id)
+        if not engine:
+            return
+
+        # Run the bot on its new settings right away instead of after the scheduler's sleep;
+        # a burst of updates coalesces into one cycle and the order bucket gates what it places
+        engine.apply_config(config)
+        if bot_id in self.running_bots:
+            self._changed.add(bot_id)
+            self._wake.set()
+
+    def resume_running_bots(self):
+        """Restart the scheduler for bots that were running before a restart"""
+        if self.running_bots:
+            self.ensure_scheduler()
+
+    def ensure_scheduler(self):
+        """Start the shared scheduling loop if it is not already running"""
+        self._loop = asyncio.get_running_loop()
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = self._loop.create_task(self.run())
+
+    async def _run_bot_cycle(self, engine: TradingEngine, inputs: MarketInputs):
+        # Never run two cycles of the same bot at once
+        if engine.bot_id in self._cycling:
+            return
+
+        self._cycling.add(engine.bot_id)
+        try:
+            async with self._semaphore:
+                await engine.execute_trading_cycle(inputs)
+        finally:
+            self._cycling.discard(engine.bot_id)
+
+    async def run_tick(self, bot_ids: Optional[set] = None):
+        """Run one trading cycle for every running bot, or only for `bot_ids`"""
+        bot_ids = self.running_bots if bot_ids is None else bot_ids & self.running_bots
+        engines = [self.engines[bot_id] for bot_id in list(bot_ids) if bot_id in self.engines]
+        if engines:
+            # One set of lazily fetched inputs per tick, shared by every bot's strategy
+            inputs = MarketInputs(self.market_data, self.ai_client)
+            await asyncio.gather(*(self._run_bot_cycle(engine, inputs) for engine in engines))
+
+    def export_state(self) -> Dict[str, Any]:
+        """Collect the in-memory state of shared caches and every bot"""
+        return {
+            'market_data': self.market_data.export_state(),
+            'ai_client': self.ai_client.export_state(),
+            'bots': {str(bot_id): engine.export_state() for bot_id, engine in self.engines.items()}
+        }
+
+    def restore_state(self, state: Optional[Dict[str, Any]]):
+        """Warm shared caches and bot engines from a snapshot"""
+        if not state:
+            return
+
+        self.market_data.restore_state(state.get('market_data', {}))
+        self.ai_client.restore_state(state.get('ai_client', {}))
+        for bot_id, engine_state in state.get('bots', {}).items():
+            engine = self.engines.get(int(bot_id))
+            if engine:
+                engine.restore_state(engine_state)
+
+        logger.info(f"Restored warm state for {len(state.get('bots', {}))} bots")
+
+    async def save_snapshot(self, force: bool = False):
+        """Write a state snapshot if the snapshot interval has elapsed"""
+        if not self.snapshot:
+            return
+        if not force and time.monotonic() - self._last_snapshot < self.snapshot_interval:
+            return
+
+        try:
+            # export_state hands out live dicts, so serialize them here before any other task
+            # can mutate them; only compression and the file write happen off the loop
+            encoded = self.snapshot.encode(self.export_state())
+            self._last_snapshot = time.monotonic()
+            await asyncio.to_thread(self.snapshot.write_encoded, encoded)
+        except Exception as e:
+            logger.error(f"Error writing state snapshot: {e}")
+
+    async def snapshot_loop(self):
+        """Write a snapshot every snapshot interval, whether or not any bot is running"""
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            await self.save_snapshot(force=True)
+
+    async def maybe_rolloff_trades(self):
+        """Move old trades to the cold archive once per roll-off interval"""
+        if self.trade_store and self.trade_store.rolloff_due():
+            try:
+                await asyncio.to_thread(self.trade_store.archive_old_trades)
+            except Exception as e:
+                logger.error(f"Error archiving trades: {e}")
+
+    async def run(self):
+        """Shared trading loop that schedules all running bots on one event loop"""
+        logger.info("Starting bot scheduler...")
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+
+        while self.running_bots:
+            try:
+                if loop.time() >= next_tick:
+                    self._changed.clear()
+                    await self.run_tick()
+                    await self.maybe_rolloff_trades()
+                    next_tick = loop.time() + self.cycle_interval
+                elif self._changed:
+                    # Off-schedule cycle for bots whose settings changed; the others keep their cadence
+                    changed, self._changed = self._changed, set()
+                    await self.run_tick(changed)
+
+                # Wait before next cycle (configurable), or until settings change
+                self._wake.clear()
+                if not self._changed:
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), max(next_tick - loop.time(), 0))
+                    except asyncio.TimeoutError:
+                        pass
+
+            except Exception as e:
+                logger.error(f"Error in bot scheduler: {e}")
+                await asyncio.sleep(60)  # Wait longer on error
+
+        logger.info("Bot scheduler idle, no running bots")
@@ -0,0 +1,91 @@
+"""
+Config Store - Live bot settings with change notifications, backed by SQLite
+"""
+
+import json
+import logging
+import threading
+from typing import Dict, List, Any, Callable
+
+from database import DB_PATH, get_connection
+
+logger = logging.getLogger(__name__)
+
+# Setting name -> bot_status column
+CONFIG_COLUMNS = {
+    'selectedStrategy': 'selected_strategy',
+    'reservePercentage': 'reserve_percentage',
+    'riskLimits': 'risk_limits'
+}
+
+class ConfigStore:
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self.version = 0
+        self._configs: Dict[int, Dict[str, Any]] = {}
+        self._subscribers: List[Callable[[int, Dict[str, Any]], None]] = []
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Load every bot's settings from the database"""
+        conn = get_connection(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('SELECT id, selected_strategy, reserve_percentage, risk_limits FROM bot_status')
+        rows = cursor.fetchall()
+        conn.close()
+
+        with self._lock:
+            for bot_id, strategy, reserve_percentage, risk_limits in rows:
+                self._configs[bot_id] = {
+                    'selectedStrategy': strategy,
+                    'reservePercentage': reserve_percentage,
+                    'riskLimits': json.loads(risk_limits) if risk_limits else {}
+                }
+            self.version += 1
+
+    def get(self, bot_id: int) -> Dict[str, Any]:
+        """Current settings of a bot; the returned dict is never mutated in place"""
+        return self._configs.get(bot_id, {})
+
+    def add_bot(self, bot_id: int, config: Dict[str, Any]):
+        """Register settings for a bot that was just inserted into the database"""
+        with self._lock:
+            self._configs[bot_id] = {'riskLimits': {}, **config}
+            self.version += 1
+
+    def subscribe(self, callback: Callable[[int, Dict[str, Any]], None]):
+        """Call `callback(bot_id, config)` after every change; it may run on any thread"""
+        self._subscribers.append(callback)
+
+    def update(self, bot_id: int, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """Write changed settings through to the database and notify subscribers"""
+        with self._lock:
+            config = dict(self._configs.get(bot_id, {}))
+            for name, value in changes.items():
+                if name not in CONFIG_COLUMNS:
+                    continue
+                if name == 'riskLimits':
+                    value = {**config.get('riskLimits', {}), **value}
+                config[name] = value
+
+            columns = [name for name in changes if name in CONFIG_COLUMNS]
+            if columns:
+                conn = get_connection(self.db_path)
+                conn.execute(f'''
+                    UPDATE bot_status
+                    SET {', '.join(f'{CONFIG_COLUMNS[name]} = ?' for name in columns)}, last_updated = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                ''', [json.dumps(config[name]) if name == 'riskLimits' else config[name] for name in columns] + [bot_id])
+                conn.commit()
+                conn.close()
+
+            self._configs[bot_id] = config
+            self.version += 1
+
+        for callback in self._subscribers:
+            try:
+                callback(bot_id, config)
+            except Exception as e:
+                logger.error(f"Error notifying config subscriber: {e}")
+
+        return config
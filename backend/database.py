@@ -0,0 +1,102 @@
+"""
+Database - SQLite location, schema and migrations shared by all backend modules
+"""
+
+import os
+import logging
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = os.getenv('TRADING_BOT_DB', 'trading_bot.db')
+DEFAULT_BOT_ID = 1
+
+def get_connection(db_path: str = None) -> sqlite3.Connection:
+    """Open a connection to the trading database"""
+    return sqlite3.connect(db_path or DB_PATH)
+
+def ensure_column(cursor: sqlite3.Cursor, table: str, column: str, definition: str):
+    """Add a column to an existing table if an older schema is missing it"""
+    cursor.execute(f'PRAGMA table_info({table})')
+    if column not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+        logger.info(f"Migrated {table}: added column {column}")
+
+def init_database(db_path: str = None):
+    """Initialize SQLite database for trade logging"""
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS trades (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            pair TEXT NOT NULL,
+            side TEXT NOT NULL,
+            amount REAL NOT NULL,
+            price REAL NOT NULL,
+            profit REAL DEFAULT 0,
+            strategy TEXT,
+            ai_confidence REAL,
+            status TEXT DEFAULT 'completed',
+            bot_id INTEGER DEFAULT 1
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS bot_status (
+            id INTEGER PRIMARY KEY,
+            is_running BOOLEAN DEFAULT FALSE,
+            balance REAL DEFAULT 10000,
+            total_profit REAL DEFAULT 0,
+            active_trades INTEGER DEFAULT 0,
+            selected_strategy TEXT DEFAULT 'Trend Following',
+            reserve_percentage INTEGER DEFAULT 10,
+            reserve_balance REAL DEFAULT 0,
+            last_updated DATETIME DEFAULT CURRENT_TIMESTAMP,
+            name TEXT,
+            risk_limits TEXT
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS grid_ladders (
+            bot_id INTEGER NOT NULL,
+            pair TEXT NOT NULL,
+            step REAL NOT NULL,
+            notional REAL NOT NULL DEFAULT 100,
+            last_price REAL NOT NULL,
+            prices BLOB NOT NULL,
+            states BLOB NOT NULL,
+            PRIMARY KEY (bot_id, pair)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS dca_plans (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            bot_id INTEGER NOT NULL,
+            pair TEXT NOT NULL,
+            amount REAL NOT NULL,
+            interval_seconds INTEGER NOT NULL,
+            min_price REAL,
+            max_price REAL,
+            next_run REAL NOT NULL,
+            active BOOLEAN DEFAULT TRUE
+        )
+    ''')
+
+    # Databases created by older versions lack these columns
+    ensure_column(cursor, 'trades', 'bot_id', 'INTEGER DEFAULT 1')
+    ensure_column(cursor, 'bot_status', 'name', 'TEXT')
+    ensure_column(cursor, 'bot_status', 'risk_limits', 'TEXT')
+    ensure_column(cursor, 'grid_ladders', 'notional', 'REAL NOT NULL DEFAULT 100')
+
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_trades_bot_timestamp ON trades (bot_id, timestamp)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_dca_plans_bot ON dca_plans (bot_id)')
+
+    # Insert default status if not exists
+    cursor.execute("INSERT OR IGNORE INTO bot_status (id, name) VALUES (?, 'Default Bot')", (DEFAULT_BOT_ID,))
+
+    conn.commit()
+    conn.close()
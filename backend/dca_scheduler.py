@@ -0,0 +1,285 @@
+"""
+DCA Scheduler - Recurring buy plans kept in a hierarchical timer wheel, backed by SQLite
+"""
+
+import math
+import heapq
+import logging
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+from database import DB_PATH, get_connection
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DCA_AMOUNT = 100.0     # USD per buy
+DEFAULT_DCA_INTERVAL = 3600    # seconds between buys
+
+class TimerWheel:
+    """Hierarchical timing wheel: `levels` wheels of 2**bits slots, each slot one tick of the level below
+
+    Scheduling is O(1); an entry is cascaded down at most once per level before it fires, so
+    advancing costs O(1) amortized per entry plus one step per elapsed tick. Gaps longer than
+    `rebuild_gap` ticks (an idle or paused bot) re-place every entry instead of stepping, so
+    they cost O(entries) rather than O(elapsed time). Entries beyond the top wheel's range
+    wait in a heap.
+    """
+
+    def __init__(self, now: float, resolution: float = 1.0, bits: int = 6, levels: int = 4):
+        self.resolution = resolution
+        self.bits = bits
+        self.levels = levels
+        self.mask = (1 << bits) - 1
+        self.span = 1 << (bits * levels)
+        # Stepping more ticks than this at once is slower than re-placing the entries
+        self.rebuild_gap = 1 << (bits * 2)
+        self.current = int(now // resolution)
+        self.wheels = [[[] for _ in range(1 << bits)] for _ in range(levels)]
+        self._overflow: List[Tuple[int, int, Any]] = []
+        self._sequence = 0
+        self._expired: List[Tuple[int, Any]] = []
+
+    def tick_of(self, when: float) -> int:
+        return int(when // self.resolution)
+
+    def schedule(self, item: Any, when: float):
+        """Fire `item` on the first advance past `when`; times already passed fire on the next advance"""
+        self._place(self.tick_of(when), item)
+
+    def _place(self, tick: int, item: Any):
+        delta = tick - self.current
+        if delta <= 0:
+            self._expired.append((tick, item))
+            return
+        if delta >= self.span:
+            self._sequence += 1
+            heapq.heappush(self._overflow, (tick, self._sequence, item))
+            return
+
+        shift = (delta.bit_length() - 1) // self.bits * self.bits
+        self.wheels[shift // self.bits][(tick >> shift) & self.mask].append((tick, item))
+
+    def advance(self, now: float) -> List[Tuple[int, Any]]:
+        """Move the wheel to `now` and return the expired (tick, item) entries"""
+        expired, self._expired = self._expired, []
+        target = self.tick_of(now)
+        if target - self.current > self.rebuild_gap:
+            self._rebuild(target)
+            expired.extend(self._expired)
+            self._expired = []
+            return expired
+
+        bits, mask, wheels = self.bits, self.mask, self.wheels
+        top_shift = bits * (self.levels - 1)
+
+        while self.current < target:
+            self.current = tick = self.current + 1
+
+            if not tick & ((1 << top_shift) - 1):
+                while self._overflow and self._overflow[0][0] - tick < self.span:
+                    due_tick, _, item = heapq.heappop(self._overflow)
+                    self._place(due_tick, item)
+
+            # Cascade each higher-level slot whose range starts at this tick
+            for level in range(1, self.levels):
+                if tick & ((1 << (bits * level)) - 1):
+                    break
+                slot = (tick >> (bits * level)) & mask
+                bucket = wheels[level][slot]
+                if bucket:
+                    wheels[level][slot] = []
+                    for entry in bucket:
+                        self._place(*entry)
+
+            # Entries due exactly at this tick were placed in _expired by the cascade
+            if self._expired:
+                expired.extend(self._expired)
+                self._expired = []
+
+            slot = tick & mask
+            bucket = wheels[0][slot]
+            if bucket:
+                wheels[0][slot] = []
+                expired.extend(bucket)
+
+        return expired
+
+    def _rebuild(self, tick: int):
+        """Jump straight to `tick`, re-placing every pending entry; overdue ones expire"""
+        entries = [entry for wheel in self.wheels for bucket in wheel for entry in bucket]
+        entries.extend((due_tick, item) for due_tick, _, item in self._overflow)
+        self.wheels = [[[] for _ in range(1 << self.bits)] for _ in range(self.levels)]
+        self._overflow = []
+        self.current = tick
+        for entry in entries:
+            self._place(*entry)
+
+class DCAPlan:
+    """A recurring buy of `amount` USD of `pair`, skipped while the price is outside its band"""
+
+    __slots__ = ('id', 'pair', 'amount', 'interval', 'min_price', 'max_price', 'next_run', 'active')
+
+    def __init__(self, id: int, pair: str, amount: float, interval: int, min_price: Optional[float] = None,
+                 max_price: Optional[float] = None, next_run: float = 0.0, active: bool = True):
+        self.id = id
+        self.pair = pair
+        self.amount = amount
+        self.interval = interval
+        self.min_price = min_price
+        self.max_price = max_price
+        self.next_run = next_run
+        self.active = active
+
+    def in_band(self, price: float) -> bool:
+        return (self.min_price is None or price >= self.min_price) and (self.max_price is None or price <= self.max_price)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'pair': self.pair,
+            'amount': self.amount,
+            'intervalSeconds': self.interval,
+            'minPrice': self.min_price,
+            'maxPrice': self.max_price,
+            'nextRun': self.next_run
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DCAPlan':
+        return cls(data['id'], data['pair'], data['amount'], data['intervalSeconds'], data.get('minPrice'),
+                   data.get('maxPrice'), data['nextRun'])
+
+class DCAScheduler:
+    """A bot's DCA plans, loaded on first use; due plans come off the timer wheel without a scan"""
+
+    def __init__(self, bot_id: int, db_path: str = DB_PATH):
+        self.bot_id = bot_id
+        self.db_path = db_path
+        self.plans: Dict[int, DCAPlan] = {}
+        self.wheel: Optional[TimerWheel] = None
+        # False until the bot has had at least one plan, active or not
+        self.has_history = False
+        self._dirty = set()
+
+    @staticmethod
+    def validate_plan(plan: Dict[str, Any]):
+        """Raise ValueError if a plan definition is malformed"""
+        if not plan.get('pair'):
+            raise ValueError("pair is required")
+        def is_number(value, types=(int, float)):
+            # bool is an int subclass, but true/false is never a valid amount or interval
+            return isinstance(value, types) and not isinstance(value, bool)
+
+        if not is_number(plan.get('amount')) or plan['amount'] <= 0:
+            raise ValueError("amount must be a positive number")
+        if not is_number(plan.get('intervalSeconds'), int) or plan['intervalSeconds'] < 1:
+            raise ValueError("intervalSeconds must be a positive integer")
+        for band in ('minPrice', 'maxPrice'):
+            if plan.get(band) is not None and (not is_number(plan[band]) or plan[band] <= 0):
+                raise ValueError(f"{band} must be a positive number")
+        if plan.get('minPrice') is not None and plan.get('maxPrice') is not None and plan['minPrice'] > plan['maxPrice']:
+            raise ValueError("minPrice must not exceed maxPrice")
+
+    def load(self, now: float):
+        """Load active plans; runs missed while the engine was down fire on the next advance"""
+        self.wheel = TimerWheel(now)
+        try:
+            conn = get_connection(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id, pair, amount, interval_seconds, min_price, max_price, next_run, active
+                FROM dca_plans WHERE bot_id = ?
+            ''', (self.bot_id,))
+            rows = cursor.fetchall()
+            conn.close()
+        except Exception as e:
+            logger.error(f"Error loading DCA plans for bot {self.bot_id}: {e}")
+            rows = []
+
+        self.has_history = bool(rows)
+        for row in rows:
+            plan = DCAPlan(*row[:7])
+            if row[7]:
+                self.plans[plan.id] = plan
+                self.wheel.schedule(plan, plan.next_run)
+        logger.info(f"Loaded {len(self.plans)} DCA plans for bot {self.bot_id}")
+
+    def add_plans(self, definitions: Iterable[Dict[str, Any]], now: float) -> List[DCAPlan]:
+        """Create plans whose first run is `now`"""
+        if self.wheel is None:
+            self.load(now)
+
+        definitions = list(definitions)
+        conn = get_connection(self.db_path)
+        cursor = conn.cursor()
+        plans = []
+        for definition in definitions:
+            cursor.execute('''
+                INSERT INTO dca_plans (bot_id, pair, amount, interval_seconds, min_price, max_price, next_run)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (self.bot_id, definition['pair'], definition['amount'], definition['intervalSeconds'],
+                  definition.get('minPrice'), definition.get('maxPrice'), now))
+            plans.append(DCAPlan(cursor.lastrowid, definition['pair'], definition['amount'],
+                                 definition['intervalSeconds'], definition.get('minPrice'),
+                                 definition.get('maxPrice'), now))
+        conn.commit()
+        conn.close()
+
+        self.has_history = self.has_history or bool(plans)
+        for plan in plans:
+            self.plans[plan.id] = plan
+            self.wheel.schedule(plan, plan.next_run)
+        return plans
+
+    def remove_plan(self, plan_id: int, now: float) -> bool:
+        """Deactivate a plan; its pending wheel entry is dropped when it expires"""
+        if self.wheel is None:
+            self.load(now)
+        plan = self.plans.pop(plan_id, None)
+        if plan is None:
+            return False
+
+        plan.active = False
+        conn = get_connection(self.db_path)
+        conn.execute('UPDATE dca_plans SET active = 0 WHERE id = ? AND bot_id = ?', (plan_id, self.bot_id))
+        conn.commit()
+        conn.close()
+        return True
+
+    def list_plans(self, now: float) -> List[Dict[str, Any]]:
+        if self.wheel is None:
+            self.load(now)
+        return [plan.to_dict() for plan in self.plans.values()]
+
+    def due(self, now: float) -> List[DCAPlan]:
+        """Plans whose run time has come, each at most once however many runs were missed"""
+        if self.wheel is None:
+            self.load(now)
+        tick_of = self.wheel.tick_of
+        # Entries left behind by removed or rescheduled plans are skipped here
+        return [plan for tick, plan in self.wheel.advance(now)
+                if plan.active and tick_of(plan.next_run) == tick]
+
+    def complete(self, plan: DCAPlan, now: float):
+        """Schedule a fired plan's next run, skipping runs that fell entirely in the past"""
+        next_run = plan.next_run + plan.interval
+        if next_run <= now:
+            next_run += plan.interval * (math.floor((now - next_run) / plan.interval) + 1)
+        plan.next_run = next_run
+        # Plans restored from a journal for replay are not tracked here
+        if self.plans.get(plan.id) is plan:
+            self.wheel.schedule(plan, next_run)
+        self._dirty.add(plan)
+
+    def save(self):
+        """Write back the next run time of plans that fired"""
+        if not self._dirty:
+            return
+        try:
+            conn = get_connection(self.db_path)
+            conn.executemany('UPDATE dca_plans SET next_run = ? WHERE id = ?',
+                             [(plan.next_run, plan.id) for plan in self._dirty])
+            conn.commit()
+            conn.close()
+            self._dirty.clear()
+        except Exception as e:
+            logger.error(f"Error saving DCA plans for bot {self.bot_id}: {e}")
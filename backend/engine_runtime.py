@@ -0,0 +1,56 @@
+"""
+Engine Runtime - Dedicated event loop thread that keeps trading isolated from HTTP traffic
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Coroutine
+
+logger = logging.getLogger(__name__)
+
+class EngineRuntime:
+    def __init__(self, name: str = 'trading-engine'):
+        self.loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._ready.set)
+        self.loop.run_forever()
+
+        # Let cancelled tasks unwind before the loop is closed
+        pending = asyncio.all_tasks(self.loop)
+        for task in pending:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        self.loop.close()
+
+    def start(self):
+        """Start the engine thread and wait until its loop is running"""
+        self._thread.start()
+        self._ready.wait()
+        logger.info(f"Engine runtime started on thread {self._thread.name}")
+
+    def submit(self, coro: Coroutine) -> Future:
+        """Schedule a coroutine on the engine loop from any thread"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def run(self, coro: Coroutine) -> Any:
+        """Run a coroutine on the engine loop and await its result from the caller's loop"""
+        return await asyncio.wrap_future(self.submit(coro))
+
+    async def call(self, func: Callable, *args) -> Any:
+        """Run a synchronous engine-side function on the engine loop"""
+        async def invoke():
+            return func(*args)
+        return await self.run(invoke())
+
+    def stop(self, timeout: float = 5):
+        """Stop the engine loop and wait for the thread to exit"""
+        if self._thread.is_alive():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout)
+            logger.info("Engine runtime stopped")
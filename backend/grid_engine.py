@@ -0,0 +1,171 @@
+"""
+Grid Engine - Persistent per-pair price ladders for the Grid Trading strategy
+"""
+
+import logging
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Any, Tuple
+
+from database import DB_PATH, get_connection
+
+logger = logging.getLogger(__name__)
+
+GRID_STEP = 0.02  # 2% between levels
+GRID_LEVELS = 10  # levels on each side of the price when a ladder is (re)built
+GRID_ORDER_NOTIONAL = 100.0  # USD bought at each level; the same quantity is sold one step up
+
+# Level fill states
+WAITING_BUY = 0  # buys when the price falls through the level
+HOLDING = 1      # bought; sells one step above the level
+
+class GridLadder:
+    """Sorted level prices with a fill state per level; crossings are found by bisection"""
+
+    __slots__ = ('step', 'notional', 'last_price', 'prices', 'states', 'changed')
+
+    def __init__(self, step: float, last_price: float, prices: array, states: bytearray, changed: bool = False,
+                 notional: float = GRID_ORDER_NOTIONAL):
+        self.step = step
+        self.notional = notional
+        self.last_price = last_price
+        self.prices = prices
+        self.states = states
+        # True while the levels or fill states differ from what was last persisted
+        self.changed = changed
+
+    @classmethod
+    def build(cls, price: float, step: float = GRID_STEP, levels: int = GRID_LEVELS,
+              notional: float = GRID_ORDER_NOTIONAL) -> 'GridLadder':
+        """Geometric ladder centred on `price` with every level waiting to buy"""
+        prices = array('d', (price * (1 + step) ** k for k in range(-levels, levels + 1)))
+        return cls(step, price, prices, bytearray(len(prices)), changed=True, notional=notional)
+
+    def crossed(self, price: float) -> List[Tuple[int, str, float]]:
+        """Orders triggered by moving from the last price to `price`, as (level, side, order price)"""
+        prices, states, last = self.prices, self.states, self.last_price
+        orders = []
+        if price < last:
+            # Levels in [price, last) were fallen through
+            for index in range(bisect_left(prices, price), bisect_left(prices, last)):
+                if states[index] == WAITING_BUY:
+                    orders.append((index, 'BUY', prices[index]))
+        elif price > last:
+            # Held levels whose sell target lies in (last, price]
+            markup = 1 + self.step
+            for index in range(bisect_right(prices, last / markup), bisect_right(prices, price / markup)):
+                if states[index] == HOLDING:
+                    orders.append((index, 'SELL', prices[index] * markup))
+        return orders
+
+    def quantity(self, index: int) -> float:
+        """Amount bought at a level and sold again one step above it"""
+        return self.notional / self.prices[index]
+
+    def fill(self, index: int, side: str):
+        """Record an executed order at a level"""
+        state = HOLDING if side == 'BUY' else WAITING_BUY
+        if self.states[index] != state:
+            self.states[index] = state
+            self.changed = True
+
+    def advance(self, price: float, levels: int = GRID_LEVELS) -> bool:
+        """Move to `price`, recentring the ladder if the price left it; True if it was rebuilt"""
+        self.last_price = price
+        if self.prices[0] <= price <= self.prices[-1]:
+            return False
+
+        # Held levels keep their inventory; the waiting levels are redrawn around the new price
+        fresh = GridLadder.build(price, self.step, levels, self.notional)
+        merged = {level: WAITING_BUY for level in fresh.prices}
+        merged.update((level, HOLDING) for level, state in zip(self.prices, self.states) if state == HOLDING)
+        ordered = sorted(merged)
+        self.prices = array('d', ordered)
+        self.states = bytearray(merged[level] for level in ordered)
+        self.changed = True
+        return True
+
+    def export_state(self) -> Dict[str, Any]:
+        return {'step': self.step, 'notional': self.notional, 'last': self.last_price,
+                'prices': self.prices.tolist(), 'states': list(self.states)}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'GridLadder':
+        return cls(state['step'], state['last'], array('d', state['prices']), bytearray(state['states']), changed=True,
+                   notional=state.get('notional', GRID_ORDER_NOTIONAL))
+
+class GridBook:
+    """A bot's ladders, loaded from SQLite on first use and written back when they change"""
+
+    def __init__(self, bot_id: int, db_path: str = DB_PATH):
+        self.bot_id = bot_id
+        self.db_path = db_path
+        self.ladders: Dict[str, GridLadder] = {}
+        # Pairs evaluated since the last save, and the last_price each has on disk
+        self._touched = set()
+        self._saved_prices: Dict[str, float] = {}
+        self._loaded = False
+
+    def _load(self):
+        try:
+            conn = get_connection(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute('SELECT pair, step, notional, last_price, prices, states FROM grid_ladders WHERE bot_id = ?',
+                           (self.bot_id,))
+            for pair, step, notional, last_price, prices, states in cursor.fetchall():
+                levels = array('d')
+                levels.frombytes(prices)
+                self.ladders[pair] = GridLadder(step, last_price, levels, bytearray(states), notional=notional)
+                self._saved_prices[pair] = last_price
+            conn.close()
+        except Exception as e:
+            logger.error(f"Error loading grid ladders for bot {self.bot_id}: {e}")
+        self._loaded = True
+
+    def get(self, pair: str, price: float) -> GridLadder:
+        """The pair's ladder, built around `price` if it has none yet"""
+        if not self._loaded:
+            self._load()
+        ladder = self.ladders.get(pair)
+        if ladder is None:
+            ladder = self.ladders[pair] = GridLadder.build(price)
+        self._touched.add(pair)
+        return ladder
+
+    def save(self):
+        """Persist what changed: whole ladders (9 bytes per level) only when levels or fills changed"""
+        rewritten = [pair for pair in self._touched if self.ladders[pair].changed]
+        moved = [pair for pair in self._touched
+                 if not self.ladders[pair].changed and self.ladders[pair].last_price != self._saved_prices.get(pair)]
+        if not rewritten and not moved:
+            self._touched.clear()
+            return
+
+        try:
+            conn = get_connection(self.db_path)
+            conn.executemany('''
+                INSERT OR REPLACE INTO grid_ladders (bot_id, pair, step, notional, last_price, prices, states)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', [(self.bot_id, pair, self.ladders[pair].step, self.ladders[pair].notional, self.ladders[pair].last_price,
+                   self.ladders[pair].prices.tobytes(), bytes(self.ladders[pair].states)) for pair in rewritten])
+            conn.executemany('UPDATE grid_ladders SET last_price = ? WHERE bot_id = ? AND pair = ?',
+                             [(self.ladders[pair].last_price, self.bot_id, pair) for pair in moved])
+            conn.commit()
+            conn.close()
+
+            for pair in rewritten + moved:
+                self.ladders[pair].changed = False
+                self._saved_prices[pair] = self.ladders[pair].last_price
+            self._touched.clear()
+        except Exception as e:
+            logger.error(f"Error saving grid ladders for bot {self.bot_id}: {e}")
+
+    def export_state(self) -> Dict[str, Any]:
+        if not self._loaded:
+            self._load()
+        return {pair: ladder.export_state() for pair, ladder in self.ladders.items()}
+
+    def restore_state(self, state: Dict[str, Any]):
+        self._loaded = True
+        self.ladders = {pair: GridLadder.from_state(ladder) for pair, ladder in state.items()}
+        self._touched.update(self.ladders)
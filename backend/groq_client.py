@@ -15,9 +15,35 @@ class GroqAIClient:
     def __init__(self):
         self.api_key = os.getenv('GROQ_API_KEY', 'demo_key')
         self.base_url = "https://api.groq.com/openai/v1"
+        # Bots analysing the same price snapshot share a single AI round-trip
+        self._analysis_key = None
+        self._analysis_cache: Dict[str, Any] = {}
+        self._analysis_lock = asyncio.Lock()
+        
+    def export_state(self) -> Dict[str, Any]:
+        """Cached analysis carried across restarts"""
+        return {'key': self._analysis_key, 'analysis': self._analysis_cache}
+    
+    def restore_state(self, state: Dict[str, Any]):
+        """Restore the cached analysis"""
+        if state.get('key') is not None:
+            self._analysis_key = tuple(tuple(item) for item in state['key'])
+            self._analysis_cache = state['analysis']
         
     async def analyze_market(self, market_data: Dict) -> Dict[str, Any]:
-        """Analyze market data and provide trading insights"""
+        """Analyze market data, reusing the last result for an identical snapshot"""
+        key = tuple(sorted((pair, data.get('price')) for pair, data in market_data.items()))
+        async with self._analysis_lock:
+            if self._analysis_cache and key == self._analysis_key:
+                return self._analysis_cache
+            
+            analysis = await self.request_market_analysis(market_data)
+            self._analysis_key = key
+            self._analysis_cache = analysis
+            return analysis
+    
+    async def request_market_analysis(self, market_data: Dict) -> Dict[str, Any]:
+        """Request fresh market analysis and trading insights"""
         try:
             # For demo purposes, we'll simulate AI analysis
             # In production, this would make actual API calls to Groq
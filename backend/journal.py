@@ -0,0 +1,137 @@
+"""
+Cycle Journal - Append-only record of trading-cycle inputs and a deterministic replayer
+"""
+
+import os
+import json
+import zlib
+import time
+import struct
+import asyncio
+import logging
+import argparse
+from typing import Dict, Any, Iterable, Iterator, Optional
+
+from database import get_connection, init_database
+from config_store import ConfigStore
+from profit_reserve import ProfitReserveManager
+from trading_engine import TradingEngine
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_PATH = os.getenv('CYCLE_JOURNAL_PATH')
+JOURNAL_MAGIC = b'CBJ1'
+# payload length, payload CRC32
+RECORD_HEADER = struct.Struct('<II')
+
+class CycleJournal:
+    """Appends one compressed record per bot cycle; a torn tail record is ignored on read"""
+
+    def __init__(self, path: str):
+        self.path = path
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'ab')
+        if new_file:
+            self._file.write(JOURNAL_MAGIC)
+            self._file.flush()
+
+    def append(self, record: Dict[str, Any]):
+        """Append a cycle record"""
+        payload = zlib.compress(json.dumps(record, separators=(',', ':')).encode('utf-8'))
+        self._file.write(RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+def read_journal(path: str) -> Iterator[Dict[str, Any]]:
+    """Iterate the records of a journal file in the order they were written"""
+    with open(path, 'rb') as f:
+        if f.read(len(JOURNAL_MAGIC)) != JOURNAL_MAGIC:
+            raise ValueError(f"{path} is not a cycle journal")
+
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            length, crc = RECORD_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                logger.warning(f"Stopping at torn or corrupt record in {path}")
+                return
+            yield json.loads(zlib.decompress(payload))
+
+class ReplayInputs:
+    """Serves the inputs a recorded cycle consumed, in place of MarketInputs"""
+
+    def __init__(self, recorded: Dict[str, Any]):
+        self.recorded = recorded
+
+    async def get(self, name: str) -> Any:
+        return self.recorded[name]
+
+    async def fetch(self, names: Iterable[str]) -> Dict[str, Any]:
+        return {name: self.recorded[name] for name in names}
+
+class JournalReplayer:
+    """Drives execute_trading_cycle from journal records against a separate database"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.config_store = ConfigStore(db_path)
+        self.engines: Dict[int, TradingEngine] = {}
+        init_database(db_path)
+
+    def _engine(self, bot_id: int) -> TradingEngine:
+        engine = self.engines.get(bot_id)
+        if engine is None:
+            conn = get_connection(self.db_path)
+            conn.execute('INSERT OR IGNORE INTO bot_status (id) VALUES (?)', (bot_id,))
+            conn.commit()
+            conn.close()
+
+            profit_manager = ProfitReserveManager(bot_id, self.db_path, self.config_store)
+            engine = TradingEngine(None, None, profit_manager, bot_id, self.db_path, self.config_store)
+            self.engines[bot_id] = engine
+        return engine
+
+    async def replay_record(self, record: Dict[str, Any]):
+        """Re-run one recorded cycle with its settings, risk and strategy state, clock and random seed"""
+        engine = self._engine(record['bot_id'])
+        self.config_store.add_bot(record['bot_id'], record['settings'])
+        engine.risk_manager.update_limits(record['settings'].get('riskLimits', {}))
+        engine.risk_manager.restore_state(record['risk'])
+        engine.risk_manager.clock = lambda: record['time']
+        strategy = engine.strategies.get(record['settings'].get('selectedStrategy'))
+        if strategy and record.get('strategy') is not None:
+            strategy.restore_state(record['strategy'])
+        await engine.execute_trading_cycle(ReplayInputs(record['inputs']), seed=record['seed'])
+
+    async def replay(self, path: str, bot_id: Optional[int] = None) -> Dict[str, Any]:
+        """Replay a journal back to back, without any of the production sleeps"""
+        cycles = 0
+        started = time.perf_counter()
+        for record in read_journal(path):
+            if bot_id is not None and record['bot_id'] != bot_id:
+                continue
+            await self.replay_record(record)
+            cycles += 1
+
+        elapsed = time.perf_counter() - started
+        return {
+            'cycles': cycles,
+            'seconds': elapsed,
+            'cycles_per_second': cycles / elapsed if elapsed else 0.0
+        }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a trading-cycle journal")
+    parser.add_argument('journal', help="journal file written with CYCLE_JOURNAL_PATH set")
+    parser.add_argument('--db', default='replay.db', help="database the replayed orders are written to")
+    parser.add_argument('--bot', type=int, help="only replay cycles of this bot")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    stats = asyncio.run(JournalReplayer(args.db).replay(args.journal, args.bot))
+    print(f"Replayed {stats['cycles']} cycles in {stats['seconds']:.3f}s "
+          f"({stats['cycles_per_second']:.0f} cycles/s)")
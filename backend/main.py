@@ -5,22 +5,35 @@ FastAPI server with AI-powered trading strategies
 """
 
 import os
+import time
 import asyncio
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import uvicorn
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-import sqlite3
+from fastapi.responses import JSONResponse, StreamingResponse
+import csv
+import io
 import json
 
 # Import our custom modules
-from trading_engine import TradingEngine
+from database import DEFAULT_BOT_ID, get_connection, init_database
+from bot_manager import BotManager
 from groq_client import GroqAIClient
-from market_data import MarketDataProvider
-from profit_reserve import ProfitReserveManager
+from market_data import MarketDataProvider, TRACKED_PAIRS
+from price_feed import venue_feed
+from trade_store import TradeStore, TRADE_COLUMNS
+from analytics import StrategyAnalytics
+from state_snapshot import StateSnapshot
+from serialization import ResponseCache, encode_response
+from risk_manager import RiskManager, DEFAULT_RISK_LIMITS
+from strategies import STRATEGY_REGISTRY
+from dca_scheduler import DCAScheduler
+from journal import CycleJournal, JOURNAL_PATH
+from engine_runtime import EngineRuntime
+from rate_limit import AdmissionController
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -43,57 +56,36 @@ app.add_middleware(
 )
 
 # Global instances
-trading_engine: Optional[TradingEngine] = None
+engine_runtime: Optional[EngineRuntime] = None
 ai_client: Optional[GroqAIClient] = None
 market_data: Optional[MarketDataProvider] = None
-profit_manager: Optional[ProfitReserveManager] = None
-bot_running = False
+bot_manager: Optional[BotManager] = None
+trade_store: Optional[TradeStore] = None
+analytics: Optional[StrategyAnalytics] = None
+response_cache = ResponseCache()
+admission = AdmissionController()
 
-# Database initialization
-def init_database():
-    """Initialize SQLite database for trade logging"""
-    conn = sqlite3.connect('trading_bot.db')
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS trades (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            pair TEXT NOT NULL,
-            side TEXT NOT NULL,
-            amount REAL NOT NULL,
-            price REAL NOT NULL,
-            profit REAL DEFAULT 0,
-            strategy TEXT,
-            ai_confidence REAL,
-            status TEXT DEFAULT 'completed'
-        )
-    ''')
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    """Rate-limit API clients and shed load before it piles up"""
+    if not request.url.path.startswith("/api/"):
+        return await call_next(request)
     
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS bot_status (
-            id INTEGER PRIMARY KEY,
-            is_running BOOLEAN DEFAULT FALSE,
-            balance REAL DEFAULT 10000,
-            total_profit REAL DEFAULT 0,
-            active_trades INTEGER DEFAULT 0,
-            selected_strategy TEXT DEFAULT 'Trend Following',
-            reserve_percentage INTEGER DEFAULT 10,
-            reserve_balance REAL DEFAULT 0,
-            last_updated DATETIME DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
+    client = request.client.host if request.client else "unknown"
+    if not admission.allow(client):
+        return JSONResponse({"detail": "Rate limit exceeded"}, status_code=429, headers={"Retry-After": "1"})
+    if not admission.enter():
+        return JSONResponse({"detail": "Server busy"}, status_code=503, headers={"Retry-After": "1"})
     
-    # Insert default status if not exists
-    cursor.execute('INSERT OR IGNORE INTO bot_status (id) VALUES (1)')
-    
-    conn.commit()
-    conn.close()
+    try:
+        return await call_next(request)
+    finally:
+        admission.leave()
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize all components on startup"""
-    global trading_engine, ai_client, market_data, profit_manager
+    global engine_runtime, ai_client, market_data, bot_manager, trade_store, analytics
     
     logger.info("Starting CryptoBot AI Backend...")
     
@@ -103,148 +95,369 @@ async def startup_event():
     # Initialize components
     try:
         ai_client = GroqAIClient()
-        market_data = MarketDataProvider()
-        profit_manager = ProfitReserveManager()
-        trading_engine = TradingEngine(ai_client, market_data, profit_manager)
+        # Consolidated venue quotes replace the simulated prices when PRICE_FEED_VENUES is set
+        feed = venue_feed(TRACKED_PAIRS)
+        market_data = MarketDataProvider(feed=feed)
+        trade_store = TradeStore()
+        trade_store.init_schema()
+        analytics = StrategyAnalytics(trade_store)
+        journal = CycleJournal(JOURNAL_PATH) if JOURNAL_PATH else None
+        bot_manager = BotManager(ai_client, market_data, trade_store, StateSnapshot(), journal=journal)
+        
+        # The engine gets its own event loop so HTTP load never delays a trading cycle
+        engine_runtime = EngineRuntime()
+        engine_runtime.start()
+        if feed:
+            engine_runtime.submit(feed.run())
+        await engine_runtime.call(bot_manager.load_bots)
+        await engine_runtime.call(bot_manager.restore_state, bot_manager.snapshot.read())
+        
+        # Snapshots run on their own timer so they keep the promised interval
+        engine_runtime.submit(bot_manager.snapshot_loop())
+        
+        # Roll off old trades without holding up startup
+        engine_runtime.submit(bot_manager.maybe_rolloff_trades())
+        
+        # Resume bots that were running before the restart
+        await engine_runtime.call(bot_manager.resume_running_bots)
         
         logger.info("All components initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize components: {e}")
 
-@app.get("/api/bot/status")
-async def get_bot_status():
-    """Get current bot status and performance metrics"""
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Persist warm state so the next start resumes immediately"""
+    if engine_runtime:
+        if bot_manager:
+            await engine_runtime.run(bot_manager.save_snapshot(force=True))
+        engine_runtime.stop()
+
+def require_bot(bot_id: int):
+    """Raise 404 unless the bot exists"""
+    if not bot_manager or not bot_manager.get_engine(bot_id):
+        raise HTTPException(status_code=404, detail=f"Bot {bot_id} not found")
+
+@app.get("/api/bots")
+async def list_bots():
+    """List all bot instances"""
     try:
-        conn = sqlite3.connect('trading_bot.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM bot_status WHERE id = 1')
-        status = cursor.fetchone()
-        
-        # Get recent trades
-        cursor.execute('''
-            SELECT pair, side, amount, price, profit, timestamp 
-            FROM trades 
-            ORDER BY timestamp DESC 
-            LIMIT 10
-        ''')
-        recent_trades = cursor.fetchall()
-        
-        # Get performance data (mock data for demo)
-        performance = [
-            {"time": "00:00", "profit": 0},
-            {"time": "04:00", "profit": 150},
-            {"time": "08:00", "profit": 280},
-            {"time": "12:00", "profit": 420},
-            {"time": "16:00", "profit": 380},
-            {"time": "20:00", "profit": 650},
-            {"time": "24:00", "profit": 820}
-        ]
-        
-        conn.close()
+        return bot_manager.list_bots() if bot_manager else []
+    except Exception as e:
+        logger.error(f"Error listing bots: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/bots")
+async def create_bot(settings: dict):
+    """Create a new bot instance"""
+    if not bot_manager:
+        raise HTTPException(status_code=503, detail="Bot manager not initialized")
+    
+    validate_settings(settings)
+    balance = settings.get('balance')
+    if balance is not None and (isinstance(balance, bool) or not isinstance(balance, (int, float)) or balance < 0):
+        raise HTTPException(status_code=400, detail="balance must be a non-negative number")
+    
+    try:
+        bot_id = await engine_runtime.call(
+            bot_manager.create_bot,
+            settings.get('name') or 'Bot',
+            settings.get('selectedStrategy') or 'Trend Following',
+            settings.get('reservePercentage', 10),
+            settings.get('balance', 10000)
+        )
+        return {"id": bot_id, "message": "Bot created successfully"}
         
-        if status:
-            return {
-                "isRunning": bool(status[1]),
-                "balance": status[2],
-                "totalProfit": status[3],
-                "activeTrades": status[4],
-                "selectedStrategy": status[5],
-                "reservePercentage": status[6],
-                "reserveBalance": status[7],
-                "performance": performance,
-                "recentTrades": [
-                    {
-                        "pair": trade[0],
-                        "type": trade[1],
-                        "amount": str(trade[2]),
-                        "price": f"${trade[3]:,.2f}",
-                        "profit": f"+${trade[4]:.2f}" if trade[4] > 0 else f"${trade[4]:.2f}",
-                        "time": trade[5]
-                    } for trade in recent_trades
-                ]
-            }
-        else:
-            return {"error": "Status not found"}
+    except Exception as e:
+        logger.error(f"Error creating bot: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+RECENT_TRADE_KEYS = ("pair", "type", "amount", "price", "profit", "time")
+TRADE_HISTORY_KEYS = ("pair", "side", "amount", "price", "profit", "timestamp", "strategy")
+
+def load_bot_status(bot_id: int) -> dict:
+    """Read bot status and recent trades; values stay raw and the client formats them"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    cursor.execute('''
+        SELECT is_running, balance, total_profit, active_trades,
+               selected_strategy, reserve_percentage, reserve_balance, name, risk_limits
+        FROM bot_status WHERE id = ?
+    ''', (bot_id,))
+    status = cursor.fetchone()
+    
+    # Get recent trades
+    cursor.execute('''
+        SELECT pair, side, amount, price, profit, timestamp 
+        FROM trades 
+        WHERE bot_id = ?
+        ORDER BY timestamp DESC 
+        LIMIT 10
+    ''', (bot_id,))
+    recent_trades = cursor.fetchall()
+    
+    conn.close()
+    
+    if not status:
+        return {"error": "Status not found"}
+    
+    # Get performance data (mock data for demo)
+    performance = [
+        {"time": "00:00", "profit": 0},
+        {"time": "04:00", "profit": 150},
+        {"time": "08:00", "profit": 280},
+        {"time": "12:00", "profit": 420},
+        {"time": "16:00", "profit": 380},
+        {"time": "20:00", "profit": 650},
+        {"time": "24:00", "profit": 820}
+    ]
+    
+    return {
+        "id": bot_id,
+        "name": status[7],
+        "isRunning": bool(status[0]),
+        "balance": status[1],
+        "totalProfit": status[2],
+        "activeTrades": status[3],
+        "selectedStrategy": status[4],
+        "reservePercentage": status[5],
+        "reserveBalance": status[6],
+        "riskLimits": {**DEFAULT_RISK_LIMITS, **json.loads(status[8] or '{}')},
+        "performance": performance,
+        "recentTrades": [dict(zip(RECENT_TRADE_KEYS, trade)) for trade in recent_trades]
+    }
+
+def load_trades(bot_id: int) -> list:
+    """Read the latest trades of a bot"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    cursor.execute('''
+        SELECT pair, side, amount, price, profit, timestamp, strategy
+        FROM trades 
+        WHERE bot_id = ?
+        ORDER BY timestamp DESC 
+        LIMIT 50
+    ''', (bot_id,))
+    trades = cursor.fetchall()
+    conn.close()
+    
+    return [dict(zip(TRADE_HISTORY_KEYS, trade)) for trade in trades]
+
+def data_version(bot_id: int):
+    """Version of a bot's data, or None when it cannot be cached"""
+    engine = bot_manager.get_engine(bot_id) if bot_manager else None
+    # The store's version moves as soon as a settings write returns, before the engine applies it
+    return (engine.state_version, bot_manager.config_store.version) if engine else None
+
+@app.get("/api/bots/{bot_id}/status")
+async def get_bot_status(bot_id: int, request: Request):
+    """Get current bot status and performance metrics"""
+    require_bot(bot_id)
+    
+    try:
+        return response_cache.respond(
+            ("status", bot_id), data_version(bot_id),
+            request.headers.get("accept"), lambda: load_bot_status(bot_id)
+        )
             
     except Exception as e:
         logger.error(f"Error getting bot status: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/bot/start")
-async def start_bot(background_tasks: BackgroundTasks):
+@app.post("/api/bots/{bot_id}/start")
+async def start_bot(bot_id: int):
     """Start the trading bot"""
-    global bot_running
+    require_bot(bot_id)
     
     try:
-        if bot_running:
+        if not await engine_runtime.call(bot_manager.start_bot, bot_id):
             return {"message": "Bot is already running"}
+        bot_manager.get_engine(bot_id).mark_changed()
         
-        bot_running = True
-        
-        # Update database
-        conn = sqlite3.connect('trading_bot.db')
-        cursor = conn.cursor()
-        cursor.execute('UPDATE bot_status SET is_running = TRUE WHERE id = 1')
-        conn.commit()
-        conn.close()
-        
-        # Start trading loop in background
-        background_tasks.add_task(trading_loop)
-        
-        logger.info("Trading bot started")
+        logger.info(f"Trading bot {bot_id} started")
         return {"message": "Trading bot started successfully"}
         
     except Exception as e:
         logger.error(f"Error starting bot: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/bot/stop")
-async def stop_bot():
+@app.post("/api/bots/{bot_id}/stop")
+async def stop_bot(bot_id: int):
     """Stop the trading bot"""
-    global bot_running
+    require_bot(bot_id)
     
     try:
-        bot_running = False
+        await engine_runtime.call(bot_manager.stop_bot, bot_id)
+        bot_manager.get_engine(bot_id).mark_changed()
         
-        # Update database
-        conn = sqlite3.connect('trading_bot.db')
-        cursor = conn.cursor()
-        cursor.execute('UPDATE bot_status SET is_running = FALSE WHERE id = 1')
-        conn.commit()
-        conn.close()
-        
-        logger.info("Trading bot stopped")
+        logger.info(f"Trading bot {bot_id} stopped")
         return {"message": "Trading bot stopped successfully"}
         
     except Exception as e:
         logger.error(f"Error stopping bot: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.put("/api/bot/settings")
-async def update_settings(settings: dict):
+def validate_settings(settings: dict):
+    """Raise 400 for settings a bot could not run with"""
+    strategy = settings.get('selectedStrategy')
+    if strategy is not None and strategy not in STRATEGY_REGISTRY:
+        raise HTTPException(status_code=400, detail=f"Unknown strategy: {strategy}")
+    
+    reserve_percentage = settings.get('reservePercentage')
+    if reserve_percentage is not None and (isinstance(reserve_percentage, bool)
+                                           or not isinstance(reserve_percentage, (int, float))
+                                           or not 0 <= reserve_percentage <= 100):
+        raise HTTPException(status_code=400, detail="reservePercentage must be a number between 0 and 100")
+    
+    risk_limits = settings.get('riskLimits')
+    if risk_limits is not None:
+        try:
+            RiskManager.validate_limits(risk_limits)
+        except (ValueError, AttributeError) as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+@app.put("/api/bots/{bot_id}/settings")
+async def update_settings(bot_id: int, settings: dict):
     """Update bot settings"""
+    require_bot(bot_id)
+    validate_settings(settings)
+    
     try:
-        conn = sqlite3.connect('trading_bot.db')
-        cursor = conn.cursor()
-        
-        # Update settings in database
-        cursor.execute('''
-            UPDATE bot_status 
-            SET selected_strategy = ?, reserve_percentage = ?, last_updated = CURRENT_TIMESTAMP
-            WHERE id = 1
-        ''', (settings.get('selectedStrategy'), settings.get('reservePercentage')))
+        # Writes through to the database; the engine is notified and runs a cycle on the new settings
+        changes = {name: value for name, value in settings.items() if value is not None}
+        await asyncio.to_thread(bot_manager.config_store.update, bot_id, changes)
         
-        conn.commit()
-        conn.close()
-        
-        logger.info(f"Settings updated: {settings}")
+        logger.info(f"Settings updated for bot {bot_id}: {settings}")
         return {"message": "Settings updated successfully"}
         
     except Exception as e:
         logger.error(f"Error updating settings: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/bots/{bot_id}/trades")
+async def get_trades(bot_id: int, request: Request):
+    """Get trading history"""
+    require_bot(bot_id)
+    
+    try:
+        return response_cache.respond(
+            ("trades", bot_id), data_version(bot_id),
+            request.headers.get("accept"), lambda: load_trades(bot_id)
+        )
+        
+    except Exception as e:
+        logger.error(f"Error getting trades: {e}")
+        return encode_response([], request.headers.get("accept"))
+
+def dca_scheduler(bot_id: int) -> DCAScheduler:
+    """The bot's DCA plans; only touched on the engine runtime thread"""
+    require_bot(bot_id)
+    return bot_manager.get_engine(bot_id).strategies['DCA'].scheduler
+
+@app.get("/api/bots/{bot_id}/dca-plans")
+async def list_dca_plans(bot_id: int):
+    """List the bot's recurring DCA plans"""
+    scheduler = dca_scheduler(bot_id)
+    try:
+        return await engine_runtime.call(scheduler.list_plans, time.time())
+    except Exception as e:
+        logger.error(f"Error listing DCA plans: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/bots/{bot_id}/dca-plans")
+async def create_dca_plan(bot_id: int, plan: dict):
+    """Add a recurring DCA plan; its first buy happens on the next cycle"""
+    scheduler = dca_scheduler(bot_id)
+    try:
+        DCAScheduler.validate_plan(plan)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        plans = await engine_runtime.call(scheduler.add_plans, [plan], time.time())
+        return plans[0].to_dict()
+    except Exception as e:
+        logger.error(f"Error creating DCA plan: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.delete("/api/bots/{bot_id}/dca-plans/{plan_id}")
+async def delete_dca_plan(bot_id: int, plan_id: int):
+    """Stop a recurring DCA plan"""
+    scheduler = dca_scheduler(bot_id)
+    try:
+        removed = await engine_runtime.call(scheduler.remove_plan, plan_id, time.time())
+    except Exception as e:
+        logger.error(f"Error deleting DCA plan: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if not removed:
+        raise HTTPException(status_code=404, detail=f"DCA plan {plan_id} not found")
+    return {"message": "DCA plan removed"}
+
+@app.get("/api/trades/export")
+def export_trades(bot_id: Optional[int] = None, start: Optional[str] = None, end: Optional[str] = None):
+    """Export trade history as CSV across the hot table and cold archives"""
+    if not trade_store:
+        raise HTTPException(status_code=503, detail="Trade store not initialized")
+    
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(TRADE_COLUMNS)
+        for i, trade in enumerate(trade_store.iter_trades(bot_id, start, end)):
+            writer.writerow([trade[column] for column in TRADE_COLUMNS])
+            if i % 1000 == 999:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    
+    return StreamingResponse(
+        generate_csv(),
+        media_type="text/csv",
+        headers={"Content-Disposition": "attachment; filename=trades.csv"}
+    )
+
+@app.get("/api/analytics")
+async def get_analytics(bot_id: Optional[int] = None):
+    """Get per-strategy and per-pair performance metrics"""
+    if not analytics:
+        raise HTTPException(status_code=503, detail="Analytics not initialized")
+    
+    try:
+        return await asyncio.to_thread(analytics.get_report, bot_id)
+    except Exception as e:
+        logger.error(f"Error computing analytics: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Single-bot endpoints used by the dashboard operate on the default bot
+@app.get("/api/bot/status")
+async def get_default_bot_status(request: Request):
+    """Get current status of the default bot"""
+    return await get_bot_status(DEFAULT_BOT_ID, request)
+
+@app.post("/api/bot/start")
+async def start_default_bot():
+    """Start the default trading bot"""
+    return await start_bot(DEFAULT_BOT_ID)
+
+@app.post("/api/bot/stop")
+async def stop_default_bot():
+    """Stop the default trading bot"""
+    return await stop_bot(DEFAULT_BOT_ID)
+
+@app.put("/api/bot/settings")
+async def update_default_settings(settings: dict):
+    """Update settings of the default bot"""
+    return await update_settings(DEFAULT_BOT_ID, settings)
+
+@app.get("/api/trades")
+async def get_default_trades(request: Request):
+    """Get trading history of the default bot"""
+    return await get_trades(DEFAULT_BOT_ID, request)
+
 @app.get("/api/market/data")
 async def get_market_data():
     """Get current market data"""
@@ -263,57 +476,6 @@ async def get_market_data():
         logger.error(f"Error getting market data: {e}")
         return []
 
-@app.get("/api/trades")
-async def get_trades():
-    """Get trading history"""
-    try:
-        conn = sqlite3.connect('trading_bot.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT pair, side, amount, price, profit, timestamp, strategy
-            FROM trades 
-            ORDER BY timestamp DESC 
-            LIMIT 50
-        ''')
-        trades = cursor.fetchall()
-        conn.close()
-        
-        return [
-            {
-                "pair": trade[0],
-                "side": trade[1],
-                "amount": trade[2],
-                "price": trade[3],
-                "profit": trade[4],
-                "timestamp": trade[5],
-                "strategy": trade[6]
-            } for trade in trades
-        ]
-        
-    except Exception as e:
-        logger.error(f"Error getting trades: {e}")
-        return []
-
-async def trading_loop():
-    """Main trading loop that runs in the background"""
-    global bot_running, trading_engine
-    
-    logger.info("Starting trading loop...")
-    
-    while bot_running:
-        try:
-            if trading_engine:
-                # Execute trading cycle
-                await trading_engine.execute_trading_cycle()
-            
-            # Wait before next cycle (configurable)
-            await asyncio.sleep(30)  # 30 seconds between cycles
-            
-        except Exception as e:
-            logger.error(f"Error in trading loop: {e}")
-            await asyncio.sleep(60)  # Wait longer on error
-
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -6,22 +6,57 @@ import os
 import logging
 import asyncio
 import random
+import time
 from typing import Dict, List, Any
 import json
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# Pairs the simulated prices and the consolidated feed cover
+TRACKED_PAIRS = ['BTC/USDT', 'ETH/USDT', 'ADA/USDT', 'SOL/USDT', 'DOT/USDT']
+
 class MarketDataProvider:
-    def __init__(self):
+    def __init__(self, price_cache_ttl: float = 5.0, feed=None):
         self.coingecko_api_key = os.getenv('COINGECKO_API_KEY', 'demo_key')
         self.news_api_key = os.getenv('NEWS_API_KEY', 'demo_key')
+        # Every bot on this host shares one price snapshot per TTL window
+        self.price_cache_ttl = price_cache_ttl
+        self._price_cache: Dict[str, Dict] = {}
+        self._price_cache_time = 0.0
+        self._price_lock = asyncio.Lock()
+        # Optional price_feed.FeedMerger whose consolidated quotes override the simulated prices
+        self.feed = feed
+        
+    def export_state(self) -> Dict[str, Any]:
+        """Cached prices carried across restarts"""
+        age = time.monotonic() - self._price_cache_time
+        return {'prices': self._price_cache, 'fetched_at': time.time() - age}
+    
+    def restore_state(self, state: Dict[str, Any]):
+        """Restore the price cache, keeping its original age"""
+        if state.get('prices'):
+            self._price_cache = state['prices']
+            self._price_cache_time = time.monotonic() - (time.time() - state['fetched_at'])
         
     async def get_current_prices(self) -> Dict[str, Dict]:
-        """Get current cryptocurrency prices"""
+        """Get current cryptocurrency prices, shared across bots for the cache TTL"""
+        async with self._price_lock:
+            now = time.monotonic()
+            if self._price_cache and now - self._price_cache_time < self.price_cache_ttl:
+                return self._price_cache
+            
+            prices = await self.fetch_current_prices()
+            if prices:
+                self._price_cache = prices
+                self._price_cache_time = now
+            return prices
+    
+    async def fetch_current_prices(self) -> Dict[str, Dict]:
+        """Fetch current cryptocurrency prices from the source"""
         try:
             # Simulate real-time price data
-            pairs = ['BTC/USDT', 'ETH/USDT', 'ADA/USDT', 'SOL/USDT', 'DOT/USDT']
+            pairs = TRACKED_PAIRS
             prices = {}
             
             base_prices = {
@@ -47,6 +82,11 @@ class MarketDataProvider:
                     'timestamp': datetime.now().isoformat()
                 }
             
+            if self.feed:
+                for pair, quote in self.feed.snapshot().items():
+                    if pair in prices:
+                        prices[pair].update(price=quote['vwMid'], bid=quote['bid'], ask=quote['ask'])
+            
             return prices
             
         except Exception as e:
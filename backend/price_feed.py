@@ -0,0 +1,256 @@
+"""
+Price Feed - Merges tick streams from several venues into one consolidated quote per pair
+"""
+
+import os
+import time
+import heapq
+import random
+import asyncio
+import logging
+import argparse
+from typing import Dict, List, Any, AsyncIterable, Awaitable, Callable, NamedTuple, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Comma-separated venue names from VENUE_FETCHERS; the feed is off when unset
+PRICE_FEED_VENUES = os.getenv('PRICE_FEED_VENUES', '')
+PRICE_FEED_INTERVAL = float(os.getenv('PRICE_FEED_INTERVAL', '1.0'))
+
+class Tick(NamedTuple):
+    timestamp: float
+    pair: str
+    bid: float
+    ask: float
+    bid_size: float
+    ask_size: float
+
+class FeedMerger:
+    """K-way merges batched tick streams by timestamp and keeps the latest quote per source and pair
+
+    Each source is an async iterable yielding lists of ticks in timestamp order (an empty list
+    means "nothing new"). Merging resumes as soon as any source delivers, so a quiet venue never
+    holds up the others; its batches are merged late and out-of-order ticks are dropped per venue.
+    `max_wait` only bounds how long a round waits when no source has anything ready.
+    """
+
+    def __init__(self, sources: Dict[str, AsyncIterable[List[Tick]]], stale_after: float = 10.0,
+                 max_wait: float = 0.05, clock: Callable[[], float] = time.time):
+        self.sources = sources
+        self.stale_after = stale_after
+        self.max_wait = max_wait
+        self.clock = clock
+        # Latest event time merged so far
+        self.watermark = 0.0
+        self.stats = {'ticks': 0, 'stale': 0, 'outOfOrder': 0}
+        # pair -> source -> latest tick
+        self._quotes: Dict[str, Dict[str, Tick]] = {}
+
+    async def run(self):
+        """Consume every source until all of them are exhausted"""
+        names = list(self.sources)
+        iterators = [self.sources[name].__aiter__() for name in names]
+        batches: List[Optional[List[Tick]]] = [None] * len(names)
+        fetches = {asyncio.ensure_future(iterator.__anext__()): index for index, iterator in enumerate(iterators)}
+        heap = []
+
+        quotes = self._quotes
+        stale_after = self.stale_after
+        stats = self.stats
+        heappop, heapreplace = heapq.heappop, heapq.heapreplace
+
+        while fetches or heap:
+            if fetches:
+                done, _ = await asyncio.wait(list(fetches), timeout=self.max_wait,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index = fetches.pop(task)
+                    try:
+                        batch = task.result()
+                    except StopAsyncIteration:
+                        continue
+                    except Exception as e:
+                        logger.error(f"Error reading price feed {names[index]}: {e}")
+                        continue
+                    if batch:
+                        batches[index] = batch
+                        heapq.heappush(heap, (batch[0][0], index, 0))
+                    else:
+                        fetches[asyncio.ensure_future(iterators[index].__anext__())] = index
+
+            watermark = self.watermark
+            merged = stale = late = 0
+            while heap:
+                timestamp, index, position = heap[0]
+                batch = batches[index]
+                tick = batch[position]
+                merged += 1
+
+                if timestamp < watermark - stale_after:
+                    stale += 1
+                else:
+                    if timestamp > watermark:
+                        watermark = timestamp
+                    book = quotes.get(tick[1])
+                    if book is None:
+                        book = quotes[tick[1]] = {}
+                    source = names[index]
+                    previous = book.get(source)
+                    if previous is not None and timestamp <= previous[0]:
+                        late += 1
+                    else:
+                        book[source] = tick
+
+                position += 1
+                if position < len(batch):
+                    heapreplace(heap, (batch[position][0], index, position))
+                else:
+                    # Nothing from this source can be ordered until its next batch arrives
+                    heappop(heap)
+                    batches[index] = None
+                    fetches[asyncio.ensure_future(iterators[index].__anext__())] = index
+                    break
+
+            self.watermark = watermark
+            stats['ticks'] += merged
+            stats['stale'] += stale
+            stats['outOfOrder'] += late
+
+    def quote(self, pair: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Consolidated best bid/ask and volume-weighted mid over the sources that are still fresh"""
+        book = self._quotes.get(pair)
+        if not book:
+            return None
+
+        cutoff = (self.clock() if now is None else now) - self.stale_after
+        best_bid = best_ask = None
+        weighted = volume = 0.0
+        latest = 0.0
+        sources = 0
+        for tick in book.values():
+            timestamp, _, bid, ask, bid_size, ask_size = tick
+            if timestamp < cutoff:
+                continue
+            sources += 1
+            if best_bid is None or bid > best_bid:
+                best_bid = bid
+            if best_ask is None or ask < best_ask:
+                best_ask = ask
+            size = bid_size + ask_size
+            weighted += (bid + ask) * 0.5 * size
+            volume += size
+            if timestamp > latest:
+                latest = timestamp
+
+        if not sources:
+            return None
+        return {
+            'bid': best_bid,
+            'ask': best_ask,
+            'mid': (best_bid + best_ask) / 2,
+            'vwMid': weighted / volume if volume else (best_bid + best_ask) / 2,
+            'sources': sources,
+            'timestamp': latest
+        }
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Consolidated quotes for every pair with at least one fresh source"""
+        now = self.clock() if now is None else now
+        quotes = {}
+        for pair in self._quotes:
+            quote = self.quote(pair, now)
+            if quote:
+                quotes[pair] = quote
+        return quotes
+
+def simulated_batches(base_prices: Dict[str, float], count: int, batch_size: int = 500, start: float = 0.0,
+                      interval: float = 0.001, seed: Optional[int] = None) -> List[List[Tick]]:
+    """Random-walk ticks for a stand-in venue, pre-chunked into batches"""
+    rng = random.Random(seed)
+    prices = dict(base_prices)
+    pairs = list(prices)
+    ticks = []
+    timestamp = start
+    for _ in range(count):
+        timestamp += rng.expovariate(1 / interval)
+        pair = rng.choice(pairs)
+        price = prices[pair] = prices[pair] * (1 + rng.uniform(-0.0005, 0.0005))
+        spread = price * 0.0002
+        ticks.append(Tick(timestamp, pair, price - spread, price + spread, rng.uniform(0.1, 5), rng.uniform(0.1, 5)))
+    return [ticks[i:i + batch_size] for i in range(0, count, batch_size)]
+
+async def iterate_batches(batches: List[List[Tick]]):
+    """Serve pre-built batches as an async tick stream"""
+    for batch in batches:
+        yield batch
+
+async def polling_source(fetch: Callable[[], Awaitable[List[Tick]]], interval: float = PRICE_FEED_INTERVAL):
+    """Turn a REST snapshot call into a tick stream, one batch per poll"""
+    while True:
+        try:
+            ticks = await fetch()
+        except Exception as e:
+            logger.error(f"Error polling price feed: {e}")
+            ticks = []
+        yield ticks
+        await asyncio.sleep(interval)
+
+async def fetch_binance(client: httpx.AsyncClient, pairs: List[str]) -> List[Tick]:
+    """Best bid/ask of every tracked pair from Binance"""
+    symbols = {pair.replace('/', ''): pair for pair in pairs}
+    response = await client.get('https://api.binance.com/api/v3/ticker/bookTicker')
+    response.raise_for_status()
+    now = time.time()
+    return [Tick(now, symbols[item['symbol']], float(item['bidPrice']), float(item['askPrice']),
+                 float(item['bidQty']), float(item['askQty']))
+            for item in response.json() if item['symbol'] in symbols]
+
+async def fetch_okx(client: httpx.AsyncClient, pairs: List[str]) -> List[Tick]:
+    """Best bid/ask of every tracked pair from OKX"""
+    instruments = {pair.replace('/', '-'): pair for pair in pairs}
+    response = await client.get('https://www.okx.com/api/v5/market/tickers', params={'instType': 'SPOT'})
+    response.raise_for_status()
+    return [Tick(int(item['ts']) / 1000, instruments[item['instId']], float(item['bidPx']), float(item['askPx']),
+                 float(item['bidSz']), float(item['askSz']))
+            for item in response.json()['data'] if item['instId'] in instruments and item['bidPx'] and item['askPx']]
+
+VENUE_FETCHERS = {
+    'binance': fetch_binance,
+    'okx': fetch_okx
+}
+
+def venue_feed(pairs: List[str], venues: str = PRICE_FEED_VENUES) -> Optional[FeedMerger]:
+    """A merger polling the configured venues, or None if no venue is configured"""
+    names = [name.strip() for name in venues.split(',') if name.strip()]
+    unknown = [name for name in names if name not in VENUE_FETCHERS]
+    if unknown:
+        logger.error(f"Unknown price feed venues ignored: {', '.join(unknown)}")
+    names = [name for name in names if name in VENUE_FETCHERS]
+    if not names:
+        return None
+
+    client = httpx.AsyncClient(timeout=5.0)
+    return FeedMerger({
+        name: polling_source(lambda fetch=VENUE_FETCHERS[name]: fetch(client, pairs))
+        for name in names
+    })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the feed merger with simulated venues")
+    parser.add_argument('--sources', type=int, default=4)
+    parser.add_argument('--ticks', type=int, default=250000, help="ticks per source")
+    parser.add_argument('--batch', type=int, default=500)
+    args = parser.parse_args()
+
+    base_prices = {'BTC/USDT': 42150.00, 'ETH/USDT': 2580.50, 'ADA/USDT': 0.4520, 'SOL/USDT': 98.50, 'DOT/USDT': 7.25}
+    feeds = {f"venue-{i}": simulated_batches(base_prices, args.ticks, args.batch, seed=i) for i in range(args.sources)}
+    merger = FeedMerger({name: iterate_batches(batches) for name, batches in feeds.items()})
+
+    started = time.perf_counter()
+    asyncio.run(merger.run())
+    elapsed = time.perf_counter() - started
+    print(f"Merged {merger.stats['ticks']} ticks in {elapsed:.3f}s ({merger.stats['ticks'] / elapsed:.0f} ticks/s)")
+    for pair, quote in merger.snapshot(merger.watermark).items():
+        print(f"{pair}: bid {quote['bid']:.4f} ask {quote['ask']:.4f} vwMid {quote['vwMid']:.4f} ({quote['sources']} sources)")
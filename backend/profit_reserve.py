@@ -3,52 +3,70 @@ Profit Reserve Manager - Handles profit allocation and reserve management
 """
 
 import logging
-import sqlite3
 from datetime import datetime, timedelta
 from typing import Dict, Any
 
+from database import DB_PATH, DEFAULT_BOT_ID, get_connection
+
 logger = logging.getLogger(__name__)
 
 class ProfitReserveManager:
-    def __init__(self):
+    def __init__(self, bot_id: int = DEFAULT_BOT_ID, db_path: str = DB_PATH, config_store=None):
+        self.bot_id = bot_id
+        self.db_path = db_path
+        self.config_store = config_store
         self.last_reserve_update = datetime.now()
         
+    def export_state(self) -> Dict[str, Any]:
+        """In-memory state carried across restarts"""
+        return {'last_reserve_update': self.last_reserve_update.isoformat()}
+    
+    def restore_state(self, state: Dict[str, Any]):
+        """Restore state written by export_state"""
+        if state.get('last_reserve_update'):
+            self.last_reserve_update = datetime.fromisoformat(state['last_reserve_update'])
+        
+    def get_reserve_percentage(self) -> float:
+        """Reserve percentage from the live config store, or the database without one"""
+        if self.config_store:
+            return self.config_store.get(self.bot_id).get('reservePercentage') or 0
+        
+        conn = get_connection(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('SELECT reserve_percentage FROM bot_status WHERE id = ?', (self.bot_id,))
+        result = cursor.fetchone()
+        conn.close()
+        return result[0] if result and result[0] else 0
+        
     async def update_reserves(self):
         """Update profit reserves based on recent trades"""
         try:
-            conn = sqlite3.connect('trading_bot.db')
-            cursor = conn.cursor()
-            
-            # Get current settings
-            cursor.execute('SELECT reserve_percentage, reserve_balance FROM bot_status WHERE id = 1')
-            result = cursor.fetchone()
-            
-            if not result:
-                conn.close()
+            reserve_percentage = self.get_reserve_percentage()
+            if reserve_percentage <= 0:
                 return
-                
-            reserve_percentage, current_reserve = result
+            
+            conn = get_connection(self.db_path)
+            cursor = conn.cursor()
             
             # Get recent profitable trades
             cursor.execute('''
                 SELECT SUM(profit) FROM trades 
-                WHERE profit > 0 AND timestamp > datetime('now', '-1 hour')
-            ''')
+                WHERE bot_id = ? AND profit > 0 AND timestamp > datetime('now', '-1 hour')
+            ''', (self.bot_id,))
             recent_profits = cursor.fetchone()[0] or 0
             
             # Calculate reserve allocation
             if recent_profits > 0:
                 reserve_amount = recent_profits * (reserve_percentage / 100)
-                new_reserve_balance = current_reserve + reserve_amount
                 
                 # Update reserve balance
                 cursor.execute('''
                     UPDATE bot_status 
-                    SET reserve_balance = ?
-                    WHERE id = 1
-                ''', (new_reserve_balance,))
+                    SET reserve_balance = reserve_balance + ?
+                    WHERE id = ?
+                ''', (reserve_amount, self.bot_id))
                 
-                logger.info(f"Added ${reserve_amount:.2f} to reserves. Total reserve: ${new_reserve_balance:.2f}")
+                logger.info(f"Added ${reserve_amount:.2f} to reserves for bot {self.bot_id}")
             
             conn.commit()
             conn.close()
@@ -72,11 +90,11 @@ class ProfitReserveManager:
     async def transfer_reserves_to_balance(self):
         """Transfer reserve balance back to main trading balance"""
         try:
-            conn = sqlite3.connect('trading_bot.db')
+            conn = get_connection(self.db_path)
             cursor = conn.cursor()
             
             # Get current balances
-            cursor.execute('SELECT balance, reserve_balance FROM bot_status WHERE id = 1')
+            cursor.execute('SELECT balance, reserve_balance FROM bot_status WHERE id = ?', (self.bot_id,))
             result = cursor.fetchone()
             
             if not result:
@@ -92,8 +110,8 @@ class ProfitReserveManager:
                 cursor.execute('''
                     UPDATE bot_status 
                     SET balance = ?, reserve_balance = 0
-                    WHERE id = 1
-                ''', (new_balance,))
+                    WHERE id = ?
+                ''', (new_balance, self.bot_id))
                 
                 logger.info(f"Transferred ${reserve_balance:.2f} from reserves to trading balance")
                 
@@ -107,14 +125,14 @@ class ProfitReserveManager:
     async def get_reserve_stats(self) -> Dict[str, Any]:
         """Get current reserve statistics"""
         try:
-            conn = sqlite3.connect('trading_bot.db')
+            conn = get_connection(self.db_path)
             cursor = conn.cursor()
             
             cursor.execute('''
                 SELECT reserve_percentage, reserve_balance, 
-                       (SELECT SUM(profit) FROM trades WHERE profit > 0) as total_profits
-                FROM bot_status WHERE id = 1
-            ''')
+                       (SELECT SUM(profit) FROM trades WHERE bot_id = bot_status.id AND profit > 0) as total_profits
+                FROM bot_status WHERE id = ?
+            ''', (self.bot_id,))
             result = cursor.fetchone()
             conn.close()
             
@@ -0,0 +1,61 @@
+"""
+Rate Limiting - Token buckets and admission control for the HTTP API
+"""
+
+import os
+import time
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """Classic token bucket; refills continuously at `rate` tokens per second"""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate: float, capacity: float, now: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic() if now is None else now
+
+    def try_acquire(self, cost: float = 1.0, now: Optional[float] = None) -> bool:
+        """Take `cost` tokens if available"""
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return True
+        return False
+
+class AdmissionController:
+    """Per-client rate limiting plus a global cap on in-flight requests"""
+
+    def __init__(self, rate: float = None, burst: float = None, max_in_flight: int = None, max_clients: int = 10000):
+        self.rate = rate if rate is not None else float(os.getenv('API_RATE_LIMIT', '20'))
+        self.burst = burst if burst is not None else float(os.getenv('API_RATE_BURST', '40'))
+        self.max_in_flight = max_in_flight if max_in_flight is not None else int(os.getenv('API_MAX_IN_FLIGHT', '64'))
+        self.max_clients = max_clients
+        self.in_flight = 0
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def allow(self, client: str) -> bool:
+        """Check the client's request rate"""
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            if len(self._buckets) >= self.max_clients:
+                self._buckets.clear()
+            bucket = self._buckets[client] = TokenBucket(self.rate, self.burst)
+        return bucket.try_acquire()
+
+    def enter(self) -> bool:
+        """Admit a request if the in-flight cap allows it"""
+        if self.in_flight >= self.max_in_flight:
+            return False
+        self.in_flight += 1
+        return True
+
+    def leave(self):
+        self.in_flight -= 1
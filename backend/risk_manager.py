@@ -0,0 +1,153 @@
+"""
+Risk Manager - In-memory pre-trade checks every order passes before it is placed
+"""
+
+import time
+import logging
+from typing import Dict, Optional, Any
+
+from rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RISK_LIMITS = {
+    'maxOrdersPerMinute': 60,
+    'maxPairNotional': 25000.0,
+    'maxTotalExposure': 100000.0,
+    'dailyLossLimit': 1000.0
+}
+
+class RollingSum:
+    """Sum over a sliding time window kept in fixed buckets, O(1) amortized per call"""
+
+    __slots__ = ('bucket_seconds', 'sums', 'epoch', 'total')
+
+    def __init__(self, window_seconds: float = 86400, buckets: int = 96):
+        self.bucket_seconds = window_seconds / buckets
+        self.sums = [0.0] * buckets
+        self.epoch = 0
+        self.total = 0.0
+
+    def _advance(self, now: float) -> int:
+        epoch = int(now // self.bucket_seconds)
+        if epoch > self.epoch:
+            # Clear the buckets that slid out of the window since the last call
+            for step in range(1, min(epoch - self.epoch, len(self.sums)) + 1):
+                index = (self.epoch + step) % len(self.sums)
+                self.total -= self.sums[index]
+                self.sums[index] = 0.0
+            self.epoch = epoch
+        return self.epoch % len(self.sums)
+
+    def add(self, value: float, now: float):
+        self.sums[self._advance(now)] += value
+        self.total += value
+
+    def value(self, now: float) -> float:
+        self._advance(now)
+        return self.total
+
+class RiskManager:
+    def __init__(self, limits: Optional[Dict[str, Any]] = None):
+        self.limits = dict(DEFAULT_RISK_LIMITS)
+        self.positions: Dict[str, float] = {}
+        self.pair_notional: Dict[str, float] = {}
+        self.total_exposure = 0.0
+        self.realized_pnl = RollingSum()
+        self.order_bucket: Optional[TokenBucket] = None
+        # Wall clock for every time-based limit; replays substitute the recorded time
+        self.clock = time.time
+        self.update_limits(limits or {})
+
+    @staticmethod
+    def validate_limits(limits: Dict[str, Any]) -> Dict[str, Any]:
+        """Check limit names and values; None disables a limit"""
+        validated = {}
+        for name, value in limits.items():
+            if name not in DEFAULT_RISK_LIMITS:
+                raise ValueError(f"Unknown risk limit: {name}")
+            if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0):
+                raise ValueError(f"Risk limit {name} must be a non-negative number or null")
+            validated[name] = value
+        return validated
+
+    def update_limits(self, limits: Dict[str, Any]):
+        """Apply new limits; counters and the order bucket's spent tokens are kept"""
+        self.limits.update(self.validate_limits(limits))
+        rate = self.limits['maxOrdersPerMinute']
+        bucket = self.order_bucket
+        if rate is None:
+            self.order_bucket = None
+        elif bucket is None:
+            self.order_bucket = TokenBucket(rate / 60, rate, self.clock())
+        elif bucket.capacity != rate:
+            # A new rate never hands out a fresh burst: bring the balance up to date, then clamp it
+            bucket.try_acquire(0, self.clock())
+            bucket.rate = rate / 60
+            bucket.capacity = rate
+            bucket.tokens = min(bucket.tokens, rate)
+        logger.info(f"Risk limits updated: {self.limits}")
+
+    def check_order(self, pair: str, side: str, amount: float, price: float, now: Optional[float] = None) -> Optional[str]:
+        """Return the reason an order is rejected, or None if it may be placed"""
+        now = self.clock() if now is None else now
+        limits = self.limits
+
+        loss_limit = limits['dailyLossLimit']
+        if loss_limit is not None and -self.realized_pnl.value(now) >= loss_limit:
+            return "daily loss limit reached"
+
+        position = self.positions.get(pair, 0.0)
+        new_position = position + amount if side == 'BUY' else position - amount
+        # Orders that shrink a position are always allowed through the exposure checks
+        if abs(new_position) > abs(position):
+            new_notional = abs(new_position) * price
+            pair_limit = limits['maxPairNotional']
+            if pair_limit is not None and new_notional > pair_limit:
+                return f"{pair} notional limit exceeded"
+
+            exposure_limit = limits['maxTotalExposure']
+            new_exposure = self.total_exposure - self.pair_notional.get(pair, 0.0) + new_notional
+            if exposure_limit is not None and new_exposure > exposure_limit:
+                return "total exposure limit exceeded"
+
+        if self.order_bucket is not None and not self.order_bucket.try_acquire(now=now):
+            return "order rate limit exceeded"
+
+        return None
+
+    def record_fill(self, pair: str, side: str, amount: float, price: float, profit: float, now: Optional[float] = None):
+        """Update counters after an order has been placed"""
+        now = self.clock() if now is None else now
+        position = self.positions.get(pair, 0.0)
+        position = position + amount if side == 'BUY' else position - amount
+        notional = abs(position) * price
+
+        self.positions[pair] = position
+        self.total_exposure += notional - self.pair_notional.get(pair, 0.0)
+        self.pair_notional[pair] = notional
+        self.realized_pnl.add(profit, now)
+
+    def export_state(self) -> Dict[str, Any]:
+        """Counters carried across restarts"""
+        return {
+            'positions': self.positions,
+            'pair_notional': self.pair_notional,
+            'pnl_sums': self.realized_pnl.sums,
+            'pnl_epoch': self.realized_pnl.epoch,
+            'order_tokens': self.order_bucket.tokens if self.order_bucket else None,
+            'order_updated': self.order_bucket.updated if self.order_bucket else None
+        }
+
+    def restore_state(self, state: Dict[str, Any]):
+        """Restore counters written by export_state"""
+        self.positions = state.get('positions', {})
+        self.pair_notional = state.get('pair_notional', {})
+        self.total_exposure = sum(self.pair_notional.values())
+        if len(state.get('pnl_sums', [])) == len(self.realized_pnl.sums):
+            self.realized_pnl.sums = state['pnl_sums']
+            self.realized_pnl.epoch = state['pnl_epoch']
+            self.realized_pnl.total = sum(self.realized_pnl.sums)
+        if self.order_bucket and state.get('order_tokens') is not None:
+            self.order_bucket.tokens = state['order_tokens']
+            self.order_bucket.updated = state['order_updated']
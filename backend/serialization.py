@@ -0,0 +1,78 @@
+"""
+Serialization - Fast JSON/MessagePack response encoding with per-version caching
+"""
+
+import json
+import logging
+import threading
+from typing import Dict, Any, Callable, Hashable, Optional, Tuple
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library encoder
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # MessagePack responses are optional
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+JSON_MEDIA_TYPE = 'application/json'
+MSGPACK_MEDIA_TYPES = ('application/x-msgpack', 'application/msgpack')
+
+def negotiate_encoding(accept: Optional[str]) -> str:
+    """Pick MessagePack when the client asks for it and it is installed"""
+    if msgpack and accept and any(media_type in accept for media_type in MSGPACK_MEDIA_TYPES):
+        return MSGPACK_MEDIA_TYPES[0]
+    return JSON_MEDIA_TYPE
+
+def encode(payload: Any, media_type: str) -> bytes:
+    """Encode a payload straight to response bytes"""
+    if media_type == JSON_MEDIA_TYPE:
+        if orjson:
+            return orjson.dumps(payload)
+        return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return msgpack.packb(payload, use_bin_type=True)
+
+def negotiated_response(body: bytes, media_type: str) -> Response:
+    """Wrap an encoded body; the format depends on Accept, so shared caches must key on it"""
+    return Response(content=body, media_type=media_type, headers={'Vary': 'Accept'})
+
+def encode_response(payload: Any, accept: Optional[str] = None) -> Response:
+    """Encode a payload in the negotiated format"""
+    media_type = negotiate_encoding(accept)
+    return negotiated_response(encode(payload, media_type), media_type)
+
+class ResponseCache:
+    """Caches encoded response bodies until the underlying data version changes"""
+
+    def __init__(self):
+        # key -> (version, {media_type: body})
+        self._entries: Dict[Hashable, Tuple[Any, Dict[str, bytes]]] = {}
+        self._lock = threading.Lock()
+
+    def respond(self, key: Hashable, version: Any, accept: Optional[str], build: Callable[[], Any]) -> Response:
+        """Return the cached body for this version, building and encoding it on a miss"""
+        media_type = negotiate_encoding(accept)
+        if version is None:
+            return negotiated_response(encode(build(), media_type), media_type)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == version and media_type in entry[1]:
+                return negotiated_response(entry[1][media_type], media_type)
+
+        body = encode(build(), media_type)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry or entry[0] != version:
+                entry = (version, {})
+                self._entries[key] = entry
+            entry[1][media_type] = body
+
+        return negotiated_response(body, media_type)
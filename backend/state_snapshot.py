@@ -0,0 +1,68 @@
+"""
+State Snapshot - Compact binary snapshot of in-memory engine state for warm restarts
+"""
+
+import os
+import mmap
+import json
+import zlib
+import struct
+import logging
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PATH = os.getenv('TRADING_BOT_SNAPSHOT', 'engine_state.snap')
+SNAPSHOT_MAGIC = b'CBSN'
+SNAPSHOT_VERSION = 1
+# magic, format version, payload length, payload CRC32
+SNAPSHOT_HEADER = struct.Struct('<4sHII')
+
+class StateSnapshot:
+    def __init__(self, path: str = SNAPSHOT_PATH):
+        self.path = path
+
+    @staticmethod
+    def encode(state: Dict[str, Any]) -> bytes:
+        """Serialize state; the result no longer shares anything with the live objects"""
+        return json.dumps(state, separators=(',', ':')).encode('utf-8')
+
+    def write(self, state: Dict[str, Any]):
+        """Atomically replace the snapshot file with the given state"""
+        self.write_encoded(self.encode(state))
+
+    def write_encoded(self, encoded: bytes):
+        """Compress and atomically write state already serialized by encode"""
+        payload = zlib.compress(encoded)
+        header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(payload), zlib.crc32(payload))
+
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """Map the snapshot file and decode it, or return None if absent or invalid"""
+        try:
+            if not os.path.exists(self.path) or os.path.getsize(self.path) < SNAPSHOT_HEADER.size:
+                return None
+
+            with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                magic, version, length, crc = SNAPSHOT_HEADER.unpack_from(mapped, 0)
+                if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                    logger.warning(f"Ignoring snapshot {self.path}: unsupported format")
+                    return None
+
+                payload = mapped[SNAPSHOT_HEADER.size:SNAPSHOT_HEADER.size + length]
+                if len(payload) != length or zlib.crc32(payload) != crc:
+                    logger.warning(f"Ignoring snapshot {self.path}: checksum mismatch")
+                    return None
+
+            return json.loads(zlib.decompress(payload))
+
+        except Exception as e:
+            logger.error(f"Error reading state snapshot: {e}")
+            return None
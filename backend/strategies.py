@@ -0,0 +1,275 @@
+"""
+Strategies - Plugin interface with declared data dependencies and lazily fetched inputs
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Any, Iterable, Optional, Tuple, Type
+
+from grid_engine import GridBook
+from dca_scheduler import DCAScheduler, DCAPlan, DEFAULT_DCA_AMOUNT, DEFAULT_DCA_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+# Inputs a strategy can declare in `requires`
+PRICES = 'prices'
+ORDER_BOOK = 'order_book'
+CANDLES = 'candles'
+INDICATORS = 'indicators'
+AI_ANALYSIS = 'ai_analysis'
+SENTIMENT = 'sentiment'
+
+class MarketInputs:
+    """Cycle inputs fetched on first use and shared by every strategy that asks for them"""
+
+    def __init__(self, market_data, ai_client):
+        self.market_data = market_data
+        self.ai_client = ai_client
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._loaders = {
+            PRICES: self._load_prices,
+            ORDER_BOOK: self._load_order_books,
+            CANDLES: self._load_candles,
+            INDICATORS: self._load_indicators,
+            AI_ANALYSIS: self._load_ai_analysis,
+            SENTIMENT: self._load_sentiment
+        }
+
+    async def get(self, name: str) -> Any:
+        """Get one input, fetching it at most once per cycle"""
+        task = self._tasks.get(name)
+        if task is None:
+            if name not in self._loaders:
+                raise KeyError(f"Unknown strategy input: {name}")
+            task = self._tasks[name] = asyncio.ensure_future(self._loaders[name]())
+        return await task
+
+    async def fetch(self, names: Iterable[str]) -> Dict[str, Any]:
+        """Fetch the declared inputs concurrently"""
+        names = list(names)
+        values = await asyncio.gather(*(self.get(name) for name in names))
+        return dict(zip(names, values))
+
+    async def _load_prices(self) -> Dict[str, Dict]:
+        return await self.market_data.get_current_prices()
+
+    async def _load_order_books(self) -> Dict[str, Dict]:
+        pairs = list(await self.get(PRICES))
+        books = await asyncio.gather(*(self.market_data.get_order_book(pair) for pair in pairs))
+        return dict(zip(pairs, books))
+
+    async def _load_candles(self) -> Dict[str, List[Dict]]:
+        pairs = list(await self.get(PRICES))
+        candles = await asyncio.gather(*(self.market_data.get_historical_data(pair) for pair in pairs))
+        return dict(zip(pairs, candles))
+
+    async def _load_indicators(self) -> Dict[str, Dict[str, float]]:
+        candles = await self.get(CANDLES)
+        return {pair: compute_indicators(series) for pair, series in candles.items()}
+
+    async def _load_ai_analysis(self) -> Dict[str, Any]:
+        return await self.ai_client.analyze_market(await self.get(PRICES))
+
+    async def _load_sentiment(self) -> Dict[str, Any]:
+        news = await self.market_data.get_news_data()
+        return await self.ai_client.analyze_news(' '.join(item['title'] for item in news))
+
+def compute_indicators(candles: List[Dict]) -> Dict[str, float]:
+    """Simple moving averages, RSI and volatility from close prices"""
+    closes = [candle['close'] for candle in candles]
+    if len(closes) < 2:
+        return {}
+
+    def sma(period: int) -> float:
+        window = closes[-period:]
+        return sum(window) / len(window)
+
+    changes = [b - a for a, b in zip(closes[-15:-1], closes[-14:])]
+    gains = sum(change for change in changes if change > 0)
+    losses = -sum(change for change in changes if change < 0)
+    returns = [b / a - 1 for a, b in zip(closes[:-1], closes[1:])]
+    mean_return = sum(returns) / len(returns)
+
+    return {
+        'sma_20': sma(20),
+        'sma_50': sma(50),
+        'rsi_14': 100.0 if not losses else 100 - 100 / (1 + gains / losses),
+        'volatility': (sum((r - mean_return) ** 2 for r in returns) / len(returns)) ** 0.5
+    }
+
+class Strategy:
+    """Base class for strategy plugins; `requires` lists the inputs passed to `run`"""
+
+    name = ''
+    requires: Tuple[str, ...] = (PRICES,)
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    async def run(self, inputs: Dict[str, Any]):
+        raise NotImplementedError
+    
+    def export_state(self) -> Optional[Dict[str, Any]]:
+        """State a cycle depends on beyond its inputs; None if stateless. Never changes the strategy"""
+        return None
+
+    def prepare(self, now: float) -> Optional[Dict[str, Any]]:
+        """Runs before each cycle is journaled; returns the state to journal, None to carry the last one forward"""
+        return self.export_state()
+    
+    def restore_state(self, state: Dict[str, Any]):
+        """Restore state returned by prepare, before a cycle is replayed"""
+        pass
+
+STRATEGY_REGISTRY: Dict[str, Type[Strategy]] = {}
+
+def register_strategy(cls: Type[Strategy]) -> Type[Strategy]:
+    """Class decorator making a strategy selectable by its name"""
+    STRATEGY_REGISTRY[cls.name] = cls
+    return cls
+
+@register_strategy
+class TrendFollowingStrategy(Strategy):
+    name = 'Trend Following'
+    requires = (PRICES, AI_ANALYSIS)
+
+    async def run(self, inputs: Dict[str, Any]):
+        """Trend following strategy implementation"""
+        try:
+            ai_analysis = inputs[AI_ANALYSIS]
+            for pair, data in inputs[PRICES].items():
+                if ai_analysis.get('trend_strength', 0) > 0.7:
+                    if ai_analysis.get('direction') == 'bullish':
+                        await self.engine.execute_buy_order(pair, data['price'], 'trend_following')
+                    elif ai_analysis.get('direction') == 'bearish':
+                        await self.engine.execute_sell_order(pair, data['price'], 'trend_following')
+        except Exception as e:
+            logger.error(f"Error in trend following strategy: {e}")
+
+@register_strategy
+class GridTradingStrategy(Strategy):
+    name = 'Grid Trading'
+    requires = (PRICES,)
+
+    def __init__(self, engine):
+        super().__init__(engine)
+        self.book = GridBook(engine.bot_id, engine.db_path)
+        self._journaled = False
+
+    async def run(self, inputs: Dict[str, Any]):
+        """Grid trading strategy implementation"""
+        try:
+            for pair, data in inputs[PRICES].items():
+                current_price = data['price']
+                ladder = self.book.get(pair, current_price)
+
+                for level, side, order_price in ladder.crossed(current_price):
+                    # A level sells exactly the quantity it bought
+                    amount = ladder.quantity(level)
+                    if side == 'BUY':
+                        executed = await self.engine.execute_buy_order(pair, order_price, 'grid_trading', amount)
+                    else:
+                        executed = await self.engine.execute_sell_order(pair, order_price, 'grid_trading', amount)
+                    if executed:
+                        ladder.fill(level, side)
+
+                ladder.advance(current_price)
+        except Exception as e:
+            logger.error(f"Error in grid trading strategy: {e}")
+        finally:
+            self.book.save()
+
+    def export_state(self) -> Dict[str, Any]:
+        return self.book.export_state()
+
+    def prepare(self, now: float) -> Optional[Dict[str, Any]]:
+        # Ladders only change through fills and recentring, which replay repeats exactly,
+        # so the whole book is journaled once and later cycles carry it forward
+        if self._journaled:
+            return None
+        self._journaled = True
+        return self.export_state()
+
+    def restore_state(self, state: Dict[str, Any]):
+        self.book.restore_state(state)
+
+@register_strategy
+class DCAStrategy(Strategy):
+    name = 'DCA'
+    requires = (PRICES,)
+
+    def __init__(self, engine):
+        super().__init__(engine)
+        self.scheduler = DCAScheduler(engine.bot_id, engine.db_path)
+        # Due plans taken off the wheel by prepare, or restored from a journal, for the next run
+        self._due: Optional[List[DCAPlan]] = None
+
+    async def run(self, inputs: Dict[str, Any]):
+        """Dollar Cost Averaging strategy implementation"""
+        try:
+            # DCA buys each plan's amount at its interval, within its price band
+            now = self.engine.cycle_time
+            prices = inputs[PRICES]
+            due, self._due = self._due if self._due is not None else self.scheduler.due(now), None
+
+            for plan in due:
+                data = prices.get(plan.pair)
+                if data and plan.in_band(data['price']):
+                    await self.engine.execute_buy_order(plan.pair, data['price'], 'dca', plan.amount / data['price'])
+                self.scheduler.complete(plan, now)
+
+            if not self.scheduler.has_history:
+                self.scheduler.add_plans(({'pair': pair, 'amount': DEFAULT_DCA_AMOUNT,
+                                           'intervalSeconds': DEFAULT_DCA_INTERVAL} for pair in prices), now)
+        except Exception as e:
+            logger.error(f"Error in DCA strategy: {e}")
+        finally:
+            self.scheduler.save()
+
+    def prepare(self, now: float) -> Dict[str, Any]:
+        """Take this cycle's due plans off the wheel, unless a replay already restored them"""
+        if self._due is None:
+            self._due = self.scheduler.due(now)
+        return {'due': [plan.to_dict() for plan in self._due]}
+
+    def restore_state(self, state: Dict[str, Any]):
+        self._due = [DCAPlan.from_dict(plan) for plan in state['due']]
+        self.scheduler.has_history = True
+
+@register_strategy
+class ScalpingStrategy(Strategy):
+    name = 'Scalping'
+    requires = (PRICES, AI_ANALYSIS)
+
+    async def run(self, inputs: Dict[str, Any]):
+        """Scalping strategy for quick profits"""
+        try:
+            ai_analysis = inputs[AI_ANALYSIS]
+            for pair, data in inputs[PRICES].items():
+                if ai_analysis.get('volatility', 0) > 0.5:
+                    if self.engine.rng.random() > 0.6:  # 40% chance to scalp
+                        side = self.engine.rng.choice(['buy', 'sell'])
+                        if side == 'buy':
+                            await self.engine.execute_buy_order(pair, data['price'], 'scalping')
+                        else:
+                            await self.engine.execute_sell_order(pair, data['price'], 'scalping')
+        except Exception as e:
+            logger.error(f"Error in scalping strategy: {e}")
+
+@register_strategy
+class MeanReversionStrategy(Strategy):
+    name = 'Mean Reversion'
+    requires = (PRICES, AI_ANALYSIS)
+
+    async def run(self, inputs: Dict[str, Any]):
+        """Mean reversion strategy implementation"""
+        try:
+            ai_analysis = inputs[AI_ANALYSIS]
+            for pair, data in inputs[PRICES].items():
+                if ai_analysis.get('deviation_from_mean', 0) > 0.8:
+                    if ai_analysis.get('price_position') == 'oversold':
+                        await self.engine.execute_buy_order(pair, data['price'], 'mean_reversion')
+                    elif ai_analysis.get('price_position') == 'overbought':
+                        await self.engine.execute_sell_order(pair, data['price'], 'mean_reversion')
+        except Exception as e:
+            logger.error(f"Error in mean reversion strategy: {e}")
@@ -0,0 +1,89 @@
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from analytics import MetricAccumulator, StrategyAnalytics
+from database import get_connection, init_database
+from trade_store import TradeStore
+
+def insert_trades(db_path, trades):
+    conn = get_connection(db_path)
+    conn.executemany('''
+        INSERT INTO trades (timestamp, pair, side, amount, price, profit, strategy, ai_confidence, bot_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', trades)
+    conn.commit()
+    conn.close()
+
+def random_trades(rng, start, count):
+    return [((start + timedelta(minutes=i)).strftime('%Y-%m-%d %H:%M:%S'), rng.choice(['BTC/USDT', 'ETH/USDT']),
+             rng.choice(['BUY', 'SELL']), rng.uniform(0.01, 0.1), rng.uniform(1000, 2000), rng.uniform(-50, 50),
+             rng.choice(['dca', 'scalping', None]), rng.choice([None, rng.random()]), rng.choice([1, 2]))
+            for i in range(count)]
+
+def make_batch(profits, confidences=None):
+    count = len(profits)
+    return {
+        'pair': np.array(['BTC/USDT'] * count, dtype=object),
+        'profit': np.array(profits, dtype=float),
+        'return': np.array(profits, dtype=float) / 1000,
+        'signed_amount': np.ones(count),
+        'time': np.arange(count, dtype=np.int64),
+        'ai_confidence': np.array(confidences if confidences is not None else [np.nan] * count, dtype=float)
+    }
+
+def assert_close(actual, expected):
+    if isinstance(expected, dict):
+        assert actual.keys() == expected.keys()
+        for key in expected:
+            assert_close(actual[key], expected[key])
+    elif isinstance(expected, list):
+        assert len(actual) == len(expected)
+        for a, e in zip(actual, expected):
+            assert_close(a, e)
+    elif isinstance(expected, float):
+        assert actual == pytest.approx(expected, rel=1e-9, abs=1e-9)
+    else:
+        assert actual == expected
+
+def test_incremental_refresh_matches_a_full_recompute(tmp_path):
+    db_path = str(tmp_path / 'trades.db')
+    init_database(db_path)
+    store = TradeStore(db_path, str(tmp_path / 'archive'))
+    store.init_schema()
+    rng = random.Random(5)
+    start = datetime(2024, 1, 1)
+
+    incremental = StrategyAnalytics(store, db_path)
+    insert_trades(db_path, random_trades(rng, start, 200))
+    incremental.refresh()
+    for batch in range(3):
+        insert_trades(db_path, random_trades(rng, start + timedelta(days=batch + 1), 50))
+        incremental.refresh()
+
+    full = StrategyAnalytics(store, db_path)
+    for bot_id in (None, 1, 2):
+        assert_close(incremental.get_report(bot_id), full.get_report(bot_id))
+
+def test_max_drawdown_carries_across_batches():
+    group = MetricAccumulator()
+    group.update(make_batch([10.0, -4.0]))
+    assert group.max_drawdown == 4.0
+
+    # The peak of 10 from the first batch still counts: 10 -> 1 is a drawdown of 9
+    group.update(make_batch([-5.0, 20.0, -3.0]))
+    assert group.max_drawdown == 9.0
+    assert group.to_dict()['totalProfit'] == 18.0
+
+def test_calibration_bins_and_brier_score():
+    group = MetricAccumulator()
+    # Trades without an AI confidence are left out of the calibration
+    group.update(make_batch([1.0, -1.0, 1.0, 1.0, -1.0], [0.15, 0.18, 0.72, 0.95, np.nan]))
+    calibration = group.to_dict()['aiCalibration']
+
+    assert calibration['brierScore'] == pytest.approx((0.85 ** 2 + 0.18 ** 2 + 0.28 ** 2 + 0.05 ** 2) / 4)
+    assert [(b['confidenceFrom'], b['trades'], b['winRate']) for b in calibration['bins']] == [
+        (0.1, 2, 0.5), (0.7, 1, 1.0), (0.9, 1, 1.0)]
+    assert [b['averageConfidence'] for b in calibration['bins']] == pytest.approx([0.165, 0.72, 0.95])
@@ -0,0 +1,40 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # The database, snapshot and trade archive paths are relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    with TestClient(main.app) as client:
+        yield client
+
+@pytest.mark.parametrize('settings', [
+    {'name': 'x', 'selectedStrategy': 'Martingale'},
+    {'name': 'x', 'reservePercentage': 150},
+    {'name': 'x', 'reservePercentage': True},
+    {'name': 'x', 'balance': -1},
+    {'name': 'x', 'balance': 'lots'},
+    {'name': 'x', 'riskLimits': {'maxOrdersPerMinute': -5}},
+])
+def test_create_bot_rejects_bad_settings(client, settings):
+    assert client.post('/api/bots', json=settings).status_code == 400
+    assert [bot['id'] for bot in client.get('/api/bots').json()] == [1]
+
+def test_create_bot_with_its_own_settings(client):
+    response = client.post('/api/bots', json={'name': 'grid', 'selectedStrategy': 'Grid Trading',
+                                              'reservePercentage': 20, 'balance': 500})
+    assert response.status_code == 200
+    bot = client.get(f"/api/bots/{response.json()['id']}/status").json()
+    assert (bot['selectedStrategy'], bot['reservePercentage'], bot['balance']) == ('Grid Trading', 20, 500)
+
+@pytest.mark.parametrize('path', ['/api/bots/99/status', '/api/bots/99/trades', '/api/bots/99/dca-plans'])
+def test_unknown_bot_routes_return_404(client, path):
+    assert client.get(path).status_code == 404
+
+def test_status_responses_vary_on_accept(client):
+    for accept in ('application/json', 'application/x-msgpack'):
+        response = client.get('/api/bots/1/status', headers={'Accept': accept})
+        assert response.status_code == 200
+        assert response.headers['vary'] == 'Accept'
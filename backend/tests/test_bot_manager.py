@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from bot_manager import BotManager
+from database import get_connection, init_database
+from groq_client import GroqAIClient
+from journal import ReplayInputs
+from market_data import MarketDataProvider
+from strategies import AI_ANALYSIS, PRICES
+
+def make_manager(db_path, **kwargs):
+    init_database(db_path)
+    manager = BotManager(GroqAIClient(), MarketDataProvider(price_cache_ttl=0), db_path=db_path, **kwargs)
+    manager.load_bots()
+    return manager
+
+def count_cycles(engine):
+    cycles = []
+    async def execute_trading_cycle(inputs=None, seed=None):
+        cycles.append(engine.config_store.get(engine.bot_id).get('selectedStrategy'))
+    engine.execute_trading_cycle = execute_trading_cycle
+    return cycles
+
+def test_settings_change_runs_a_cycle_without_waiting_for_the_interval(tmp_path):
+    async def scenario():
+        manager = make_manager(str(tmp_path / 'bots.db'), cycle_interval=30)
+        first, second = manager.create_bot('a', 'DCA'), manager.create_bot('b', 'DCA')
+        first_cycles = count_cycles(manager.get_engine(first))
+        second_cycles = count_cycles(manager.get_engine(second))
+        manager.start_bot(first)
+        manager.start_bot(second)
+        await asyncio.sleep(0.05)
+
+        # A burst of updates coalesces into a single extra cycle of that bot only
+        for strategy in ('Scalping', 'Mean Reversion', 'Grid Trading'):
+            manager.config_store.update(first, {'selectedStrategy': strategy})
+        await asyncio.sleep(0.05)
+        manager._loop_task.cancel()
+        return first_cycles, second_cycles
+
+    first_cycles, second_cycles = asyncio.run(scenario())
+    assert first_cycles == ['DCA', 'Grid Trading']
+    assert second_cycles == ['DCA']
+
+def test_bots_keep_separate_trades_balance_and_profit(tmp_path):
+    db_path = str(tmp_path / 'bots.db')
+    manager = make_manager(db_path)
+    first = manager.create_bot('a', 'Mean Reversion', balance=5000)
+    second = manager.create_bot('b', 'Mean Reversion', balance=20000)
+    inputs = ReplayInputs({
+        PRICES: {'BTC/USDT': {'price': 40000.0}, 'ETH/USDT': {'price': 2500.0}},
+        AI_ANALYSIS: {'deviation_from_mean': 0.9, 'price_position': 'oversold'}
+    })
+    for _ in range(3):
+        asyncio.run(manager.get_engine(first).execute_trading_cycle(inputs))
+
+    conn = get_connection(db_path)
+    trades = dict(conn.execute('SELECT bot_id, COUNT(*) FROM trades GROUP BY bot_id').fetchall())
+    status = {bot_id: (balance, profit) for bot_id, balance, profit in
+              conn.execute('SELECT id, balance, total_profit FROM bot_status WHERE id IN (?, ?)', (first, second))}
+    first_profit = conn.execute('SELECT SUM(profit) FROM trades WHERE bot_id = ?', (first,)).fetchone()[0]
+    conn.close()
+
+    assert trades == {first: 6}
+    assert status[first] == (5000, pytest.approx(first_profit))
+    assert status[second] == (20000, 0)
@@ -0,0 +1,62 @@
+import random
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from database import init_database
+from dca_scheduler import DCAScheduler, TimerWheel
+from strategies import DCAStrategy
+
+def test_entries_fire_on_the_first_advance_past_their_time():
+    rng = random.Random(3)
+    # Tiny wheel so cascades, overflow and rebuilds all happen
+    wheel = TimerWheel(1000, bits=2, levels=3)
+    due = {}
+    for item in range(2000):
+        when = 1000 + rng.uniform(-5, 500)
+        wheel.schedule(item, when)
+        due[item] = int(when)
+
+    now, fired = 1000, set()
+    while now < 1600:
+        now += rng.choice([0.5, 1, 2, 7, 30])
+        for tick, item in wheel.advance(now):
+            assert tick == due[item] <= int(now)
+            assert item not in fired
+            fired.add(item)
+    assert fired == {item for item, tick in due.items() if tick <= int(now)}
+
+def test_long_idle_gap_does_not_step_through_every_tick():
+    wheel = TimerWheel(0)
+    for item in range(1000):
+        wheel.schedule(item, item * 3600)
+
+    started = time.perf_counter()
+    expired = wheel.advance(30 * 86400)
+    assert time.perf_counter() - started < 0.05
+    assert len(expired) == 30 * 24 + 1
+
+    # Entries past the gap are still scheduled correctly
+    assert [item for _, item in wheel.advance(30 * 86400 + 3600)] == [30 * 24 + 1]
+
+@pytest.mark.parametrize('changes', [
+    {'intervalSeconds': True},
+    {'amount': True},
+    {'amount': 0},
+    {'minPrice': 50000, 'maxPrice': 40000}
+])
+def test_invalid_plans_are_rejected(changes):
+    plan = {'pair': 'BTC/USDT', 'amount': 100, 'intervalSeconds': 3600, **changes}
+    with pytest.raises(ValueError):
+        DCAScheduler.validate_plan(plan)
+
+def test_exporting_dca_state_leaves_due_plans_on_the_wheel(tmp_path):
+    db_path = str(tmp_path / 'dca.db')
+    init_database(db_path)
+    strategy = DCAStrategy(SimpleNamespace(bot_id=1, db_path=db_path, cycle_time=1000.0))
+    strategy.scheduler.add_plans([{'pair': 'BTC/USDT', 'amount': 50.0, 'intervalSeconds': 60}], 1000.0)
+
+    strategy.export_state()
+    state = strategy.prepare(1000.0)
+    assert [plan['pair'] for plan in state['due']] == ['BTC/USDT']
@@ -0,0 +1,68 @@
+from database import get_connection, init_database
+from grid_engine import GridBook, GridLadder, HOLDING
+
+def test_crossings_fill_levels_and_sell_one_step_up():
+    ladder = GridLadder.build(100.0, step=0.02, levels=5)
+    ladder.changed = False
+
+    # 95 falls through the 98.04 and 96.12 levels
+    orders = ladder.crossed(95.0)
+    assert [side for _, side, _ in orders] == ['BUY', 'BUY']
+    for level, side, _ in orders:
+        ladder.fill(level, side)
+    ladder.advance(95.0)
+    assert ladder.changed
+
+    sells = ladder.crossed(100.5)
+    assert [side for _, side, _ in sells] == ['SELL', 'SELL']
+    assert abs(sells[-1][2] - 100.0) < 1e-9
+
+def test_unchanged_ladders_only_write_their_last_price(tmp_path):
+    db_path = str(tmp_path / 'grid.db')
+    init_database(db_path)
+    book = GridBook(1, db_path)
+    book.get('BTC/USDT', 100.0).advance(100.0)
+    book.save()
+
+    conn = get_connection(db_path)
+    conn.execute("UPDATE grid_ladders SET prices = x'00'")
+    conn.commit()
+
+    # A price move inside the ladder that crosses nothing
+    ladder = book.get('BTC/USDT', 100.5)
+    assert ladder.crossed(100.5) == []
+    ladder.advance(100.5)
+    book.save()
+
+    prices, last_price = conn.execute('SELECT prices, last_price FROM grid_ladders').fetchone()
+    conn.close()
+    assert prices == b'\x00'
+    assert last_price == 100.5
+
+def test_filled_ladder_survives_a_reload(tmp_path):
+    db_path = str(tmp_path / 'grid.db')
+    init_database(db_path)
+    book = GridBook(1, db_path)
+    ladder = book.get('BTC/USDT', 100.0)
+    level, side, _ = ladder.crossed(97.0)[0]
+    ladder.fill(level, side)
+    ladder.advance(97.0)
+    book.save()
+
+    reloaded = GridBook(1, db_path).get('BTC/USDT', 97.0)
+    assert reloaded.states[level] == HOLDING
+    assert reloaded.last_price == 97.0
+
+def test_level_sells_the_quantity_it_bought():
+    ladder = GridLadder.build(100.0, step=0.02, levels=5, notional=50.0)
+    level, side, price = ladder.crossed(97.0)[0]
+    bought = ladder.quantity(level)
+    assert abs(bought * price - 50.0) < 1e-9
+    ladder.fill(level, side)
+    ladder.advance(97.0)
+
+    # Recentring keeps the held level, and with it the quantity it will sell
+    ladder.advance(60.0)
+    index = ladder.prices.index(price)
+    assert ladder.states[index] == HOLDING
+    assert ladder.quantity(index) == bought
@@ -0,0 +1,68 @@
+import asyncio
+import random
+import sqlite3
+import time
+
+from bot_manager import BotManager
+from database import init_database
+from groq_client import GroqAIClient
+from journal import CycleJournal, JournalReplayer, ReplayInputs, read_journal
+from market_data import MarketDataProvider
+from strategies import AI_ANALYSIS, PRICES, STRATEGY_REGISTRY
+
+# Wide swings so grid levels are crossed both ways and the ladder recentres
+PRICE_PATH = [100.0, 95.0, 91.0, 97.0, 104.0, 99.0, 70.0, 74.0, 69.0, 80.0]
+
+# Analysis that makes every AI-driven strategy trade
+ANALYSIS = {'trend_strength': 0.9, 'direction': 'bullish', 'volatility': 0.9,
+            'deviation_from_mean': 0.9, 'price_position': 'oversold'}
+
+TRADE_QUERY = '''
+    SELECT bot_id, pair, side, amount, price, profit, strategy, ai_confidence
+    FROM trades ORDER BY id
+'''
+
+def cycle_inputs(step):
+    price = PRICE_PATH[step]
+    return ReplayInputs({
+        PRICES: {'BTC/USDT': {'price': price * 400}, 'ETH/USDT': {'price': price * 25}},
+        AI_ANALYSIS: dict(ANALYSIS, direction='bullish' if step % 3 else 'bearish')
+    })
+
+async def record(db_path, journal_path):
+    journal = CycleJournal(journal_path)
+    manager = BotManager(GroqAIClient(), MarketDataProvider(), journal=journal, db_path=db_path)
+    manager.load_bots()
+    engines = [manager.get_engine(manager.create_bot(name, name)) for name in STRATEGY_REGISTRY]
+
+    # DCA plans are hourly, so an hour passes between cycles
+    start = time.time()
+    for step in range(len(PRICE_PATH)):
+        for engine in engines:
+            engine.risk_manager.clock = lambda: start + step * 3600
+            await engine.execute_trading_cycle(cycle_inputs(step))
+    journal.close()
+
+def test_replayed_cycles_place_the_same_orders(tmp_path):
+    db_path, replay_path, journal_path = (str(tmp_path / name) for name in ('live.db', 'replay.db', 'cycles.jnl'))
+    init_database(db_path)
+    random.seed(7)
+    asyncio.run(record(db_path, journal_path))
+
+    stats = asyncio.run(JournalReplayer(replay_path).replay(journal_path))
+    assert stats['cycles'] == len(PRICE_PATH) * len(STRATEGY_REGISTRY)
+
+    recorded = sqlite3.connect(db_path).execute(TRADE_QUERY).fetchall()
+    replayed = sqlite3.connect(replay_path).execute(TRADE_QUERY).fetchall()
+    assert {trade[6] for trade in recorded} == {'trend_following', 'grid_trading', 'dca', 'scalping', 'mean_reversion'}
+    assert replayed == recorded
+
+def test_grid_ladders_are_journaled_once(tmp_path):
+    db_path, journal_path = str(tmp_path / 'live.db'), str(tmp_path / 'cycles.jnl')
+    init_database(db_path)
+    asyncio.run(record(db_path, journal_path))
+
+    grid_states = [record['strategy'] for record in read_journal(journal_path)
+                   if record['settings']['selectedStrategy'] == 'Grid Trading']
+    assert len(grid_states) == len(PRICE_PATH)
+    assert grid_states[0] is not None and grid_states[1:] == [None] * (len(PRICE_PATH) - 1)
@@ -0,0 +1,36 @@
+import asyncio
+import time
+
+from price_feed import FeedMerger, Tick, iterate_batches, simulated_batches
+
+BASE_PRICES = {'BTC/USDT': 42150.00, 'ETH/USDT': 2580.50}
+
+def test_idle_venue_does_not_stall_a_busy_one():
+    finished = {}
+
+    async def busy():
+        async for batch in iterate_batches(simulated_batches(BASE_PRICES, 100000, seed=1)):
+            yield batch
+        finished['busy'] = time.perf_counter()
+
+    async def idle():
+        yield [Tick(0.0, 'BTC/USDT', 42000.0, 42010.0, 1.0, 1.0)]
+        await asyncio.sleep(2)
+
+    merger = FeedMerger({'busy': busy(), 'idle': idle()})
+    started = time.perf_counter()
+    asyncio.run(merger.run())
+
+    assert merger.stats['ticks'] == 100001
+    # 100k+ ticks/s while the other venue has nothing to say
+    assert finished['busy'] - started < 1.0
+
+def test_consolidated_quote_drops_late_and_stale_ticks():
+    busy = [[Tick(1, 'X', 99, 101, 1, 1), Tick(3, 'X', 100, 102, 1, 1)]]
+    lagging = [[Tick(2, 'X', 98, 100.5, 3, 3)], [Tick(2.5, 'X', 97, 99, 1, 1), Tick(-50, 'X', 1, 2, 1, 1)]]
+    merger = FeedMerger({'a': iterate_batches(busy), 'b': iterate_batches(lagging)})
+    asyncio.run(merger.run())
+
+    assert merger.stats['stale'] == 1
+    quote = merger.quote('X', now=3)
+    assert (quote['bid'], quote['ask'], quote['sources']) == (100, 99, 2)
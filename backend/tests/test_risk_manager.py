@@ -0,0 +1,28 @@
+import pytest
+
+from risk_manager import RiskManager
+
+def drained_manager(now=1000.0):
+    manager = RiskManager({'maxOrdersPerMinute': 60})
+    manager.clock = lambda: now
+    manager.order_bucket.updated = now
+    while manager.check_order('BTC/USDT', 'BUY', 0.0001, 1) is None:
+        pass
+    return manager
+
+def test_updating_limits_does_not_refill_the_order_bucket():
+    manager = drained_manager()
+    manager.update_limits({})
+    manager.update_limits({'maxPairNotional': 5000})
+    manager.update_limits({'maxOrdersPerMinute': 120})
+    assert manager.check_order('BTC/USDT', 'BUY', 0.0001, 1) == "order rate limit exceeded"
+
+def test_lowering_the_rate_clamps_tokens_to_the_new_capacity():
+    manager = RiskManager({'maxOrdersPerMinute': 60})
+    manager.update_limits({'maxOrdersPerMinute': 5})
+    assert manager.order_bucket.tokens == 5
+
+@pytest.mark.parametrize('value', [True, False, 'ten', -1])
+def test_invalid_limit_values_are_rejected(value):
+    with pytest.raises(ValueError):
+        RiskManager.validate_limits({'maxPairNotional': value})
@@ -0,0 +1,26 @@
+import pytest
+
+from serialization import ResponseCache, encode_response
+
+@pytest.mark.parametrize('accept, media_type', [(None, 'application/json'),
+                                                ('application/x-msgpack', 'application/x-msgpack')])
+def test_negotiated_responses_vary_on_accept(accept, media_type):
+    if accept:
+        pytest.importorskip('msgpack')
+    cache = ResponseCache()
+    responses = [encode_response({'a': 1}, accept),
+                 cache.respond('key', None, accept, lambda: {'a': 1}),
+                 cache.respond('key', 1, accept, lambda: {'a': 1}),
+                 cache.respond('key', 1, accept, lambda: {'a': 2})]
+    for response in responses:
+        assert response.headers['vary'] == 'Accept'
+        assert response.media_type == media_type
+
+def test_cache_serves_each_format_for_the_current_version():
+    msgpack = pytest.importorskip('msgpack')
+    cache = ResponseCache()
+    cache.respond('key', 1, None, lambda: {'a': 1})
+    packed = cache.respond('key', 1, 'application/x-msgpack', lambda: {'a': 1})
+    assert msgpack.unpackb(packed.body) == {'a': 1}
+    assert cache.respond('key', 1, None, lambda: {'a': 2}).body == b'{"a":1}'
+    assert cache.respond('key', 2, None, lambda: {'a': 2}).body == b'{"a":2}'
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from bot_manager import BotManager
+from database import init_database
+from groq_client import GroqAIClient
+from journal import ReplayInputs
+from market_data import MarketDataProvider
+from state_snapshot import SNAPSHOT_HEADER, StateSnapshot
+from strategies import AI_ANALYSIS, PRICES
+
+def make_manager(db_path):
+    manager = BotManager(GroqAIClient(), MarketDataProvider(), db_path=db_path)
+    manager.load_bots()
+    return manager
+
+@pytest.fixture
+def snapshot(tmp_path):
+    snapshot = StateSnapshot(str(tmp_path / 'engine_state.snap'))
+    snapshot.write({'bots': {'1': {'active_positions': {'BTC/USDT': 0.5}}}, 'ai_client': {}})
+    return snapshot
+
+def test_snapshot_restores_the_same_state(tmp_path):
+    db_path = str(tmp_path / 'bots.db')
+    init_database(db_path)
+    manager = make_manager(db_path)
+    bot_id = manager.create_bot('a', 'Trend Following')
+    inputs = ReplayInputs({PRICES: {'BTC/USDT': {'price': 40000.0}},
+                           AI_ANALYSIS: {'trend_strength': 0.9, 'direction': 'bullish'}})
+    asyncio.run(manager.get_engine(bot_id).execute_trading_cycle(inputs))
+    state = manager.export_state()
+    assert state['bots'][str(bot_id)]['risk']['positions']
+
+    snapshot = StateSnapshot(str(tmp_path / 'engine_state.snap'))
+    snapshot.write(state)
+    restored = make_manager(db_path)
+    restored.restore_state(snapshot.read())
+    exported = restored.export_state()
+    # The price cache keeps its age, so its wall-clock fetch time is recomputed on export
+    assert exported['market_data'].pop('fetched_at') == pytest.approx(state['market_data'].pop('fetched_at'), abs=1)
+    assert exported == state
+
+def test_missing_snapshot_reads_as_none(tmp_path):
+    assert StateSnapshot(str(tmp_path / 'absent.snap')).read() is None
+
+@pytest.mark.parametrize('keep', [SNAPSHOT_HEADER.size - 1, SNAPSHOT_HEADER.size + 3])
+def test_truncated_snapshot_reads_as_none(snapshot, keep):
+    with open(snapshot.path, 'r+b') as f:
+        f.truncate(keep)
+    assert snapshot.read() is None
+
+def test_checksum_mismatch_reads_as_none(snapshot):
+    with open(snapshot.path, 'r+b') as f:
+        f.seek(SNAPSHOT_HEADER.size + 2)
+        byte = f.read(1)
+        f.seek(-1, 1)
+        f.write(bytes([byte[0] ^ 0xFF]))
+    assert snapshot.read() is None
+
+def test_wrong_magic_reads_as_none(snapshot):
+    with open(snapshot.path, 'r+b') as f:
+        f.write(b'XXXX')
+    assert snapshot.read() is None
@@ -0,0 +1,39 @@
+import time
+from datetime import datetime, timedelta
+
+from database import get_connection, init_database
+from trade_store import TradeStore
+
+def insert_trade(db_path, timestamp):
+    conn = get_connection(db_path)
+    conn.execute('''
+        INSERT INTO trades (timestamp, pair, side, amount, price, strategy, bot_id)
+        VALUES (?, 'BTC/USDT', 'BUY', 0.1, 42000, 'dca', 1)
+    ''', (timestamp.strftime('%Y-%m-%d %H:%M:%S'),))
+    conn.commit()
+    conn.close()
+
+def test_rolloff_keeps_trades_that_cross_the_cutoff_mid_archive(tmp_path, monkeypatch):
+    db_path = str(tmp_path / 'trades.db')
+    init_database(db_path)
+    store = TradeStore(db_path, str(tmp_path / 'archive'))
+    store.init_schema()
+
+    now = datetime.utcnow()
+    insert_trade(db_path, now - timedelta(days=40))
+    insert_trade(db_path, now - timedelta(days=30) + timedelta(seconds=1))
+
+    # A slow archive write lets the second trade age past the retention window
+    write_archive = store._write_archive
+    def slow_write(path, data):
+        write_archive(path, data)
+        time.sleep(1.5)
+    monkeypatch.setattr(store, '_write_archive', slow_write)
+
+    assert store.archive_old_trades() == 1
+
+    conn = get_connection(db_path)
+    hot = conn.execute('SELECT COUNT(*) FROM trades').fetchone()[0]
+    conn.close()
+    assert hot == 1
+    assert len(list(store.iter_trades())) == 2
@@ -0,0 +1,168 @@
+"""
+Trade Store - Hot SQLite partition with compressed columnar monthly archives
+"""
+
+import os
+import gzip
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Any, Iterator
+
+from database import DB_PATH, get_connection
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = os.getenv('TRADE_ARCHIVE_DIR', 'trade_archive')
+TRADE_COLUMNS = ['id', 'timestamp', 'pair', 'side', 'amount', 'price', 'profit',
+                 'strategy', 'ai_confidence', 'status', 'bot_id']
+
+class TradeStore:
+    def __init__(self, db_path: str = DB_PATH, archive_dir: str = ARCHIVE_DIR,
+                 retention_days: int = 30, rolloff_interval: float = 86400):
+        self.db_path = db_path
+        self.archive_dir = archive_dir
+        self.retention_days = retention_days
+        self.rolloff_interval = rolloff_interval
+        self.last_rolloff: Optional[datetime] = None
+        self._rolloff_lock = threading.Lock()
+
+    def init_schema(self):
+        """Create the archive catalogue and the indexes used by hot-path queries"""
+        conn = get_connection(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS trade_archives (
+                period TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                row_count INTEGER NOT NULL,
+                min_timestamp DATETIME,
+                max_timestamp DATETIME
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_trades_timestamp ON trades (timestamp)')
+        conn.commit()
+        conn.close()
+
+    def rolloff_due(self) -> bool:
+        """Check whether the periodic roll-off should run"""
+        if self.last_rolloff is None:
+            return True
+        return (datetime.now() - self.last_rolloff).total_seconds() >= self.rolloff_interval
+
+    def archive_path(self, period: str) -> str:
+        return os.path.join(self.archive_dir, f"trades-{period}.json.gz")
+
+    def _read_archive(self, path: str) -> Dict[str, List[Any]]:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return json.load(f)['data']
+
+    def _write_archive(self, path: str, data: Dict[str, List[Any]]):
+        tmp_path = path + '.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=9) as f:
+            json.dump({'columns': TRADE_COLUMNS, 'data': data}, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    def archive_old_trades(self, now: Optional[datetime] = None) -> int:
+        """Move trades older than the retention window into monthly archive files"""
+        with self._rolloff_lock:
+            self.last_rolloff = datetime.now()
+            # Fixed once, so the rows deleted are exactly the rows that were archived
+            cutoff = (now or datetime.utcnow()) - timedelta(days=self.retention_days)
+            return self._archive_old_trades(cutoff.strftime('%Y-%m-%d %H:%M:%S'))
+
+    def _archive_old_trades(self, cutoff: str) -> int:
+        os.makedirs(self.archive_dir, exist_ok=True)
+
+        conn = get_connection(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT DISTINCT substr(timestamp, 1, 7) FROM trades WHERE timestamp < ?', (cutoff,))
+        periods = [row[0] for row in cursor.fetchall()]
+
+        archived = 0
+        for period in periods:
+            cursor.execute(f'''
+                SELECT {', '.join(TRADE_COLUMNS)} FROM trades
+                WHERE timestamp < ? AND substr(timestamp, 1, 7) = ?
+                ORDER BY timestamp, id
+            ''', (cutoff, period))
+            rows = cursor.fetchall()
+            if not rows:
+                continue
+
+            path = self.archive_path(period)
+            data = {column: [] for column in TRADE_COLUMNS}
+            if os.path.exists(path):
+                data = self._read_archive(path)
+
+            # Skip ids already archived by an earlier, interrupted roll-off
+            archived_ids = set(data['id'])
+            for row in rows:
+                if row[0] in archived_ids:
+                    continue
+                for column, value in zip(TRADE_COLUMNS, row):
+                    data[column].append(value)
+
+            self._write_archive(path, data)
+
+            cursor.execute('''
+                INSERT OR REPLACE INTO trade_archives (period, path, row_count, min_timestamp, max_timestamp)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (period, path, len(data['id']), min(data['timestamp']), max(data['timestamp'])))
+            cursor.execute('''
+                DELETE FROM trades
+                WHERE timestamp < ? AND substr(timestamp, 1, 7) = ? AND id <= ?
+            ''', (cutoff, period, max(row[0] for row in rows)))
+            conn.commit()
+
+            archived += len(rows)
+            logger.info(f"Archived {len(rows)} trades for {period} to {path}")
+
+        # No VACUUM: it would lock out order inserts from running cycles, and SQLite
+        # reuses the freed pages for new trades anyway
+        conn.close()
+        return archived
+
+    def _archived_periods(self, start: Optional[str], end: Optional[str]) -> List[str]:
+        conn = get_connection(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT path FROM trade_archives
+            WHERE (? IS NULL OR max_timestamp >= ?) AND (? IS NULL OR min_timestamp < ?)
+            ORDER BY period
+        ''', (start, start, end, end))
+        paths = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        return paths
+
+    def iter_trades(self, bot_id: Optional[int] = None, start: Optional[str] = None,
+                    end: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Iterate trades in time order across archives and the hot partition"""
+        for path in self._archived_periods(start, end):
+            if not os.path.exists(path):
+                logger.warning(f"Trade archive missing: {path}")
+                continue
+
+            data = self._read_archive(path)
+            for row in zip(*(data[column] for column in TRADE_COLUMNS)):
+                trade = dict(zip(TRADE_COLUMNS, row))
+                if bot_id is not None and trade['bot_id'] != bot_id:
+                    continue
+                if start is not None and trade['timestamp'] < start:
+                    continue
+                if end is not None and trade['timestamp'] >= end:
+                    continue
+                yield trade
+
+        conn = get_connection(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT {', '.join(TRADE_COLUMNS)} FROM trades
+            WHERE (? IS NULL OR bot_id = ?) AND (? IS NULL OR timestamp >= ?) AND (? IS NULL OR timestamp < ?)
+            ORDER BY timestamp, id
+        ''', (bot_id, bot_id, start, start, end, end))
+        for row in cursor:
+            yield dict(zip(TRADE_COLUMNS, row))
+        conn.close()
@@ -2,190 +2,207 @@
 Trading Engine - Core trading logic with multiple strategies
 """
 
-import asyncio
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Optional
 import random
-import sqlite3
+
+from database import DB_PATH, DEFAULT_BOT_ID, get_connection
+from risk_manager import RiskManager
+from strategies import STRATEGY_REGISTRY, MarketInputs
 
 logger = logging.getLogger(__name__)
 
 class TradingEngine:
-    def __init__(self, ai_client, market_data, profit_manager):
+    def __init__(self, ai_client, market_data, profit_manager, bot_id: int = DEFAULT_BOT_ID, db_path: str = DB_PATH,
+                 config_store=None):
         self.ai_client = ai_client
         self.market_data = market_data
         self.profit_manager = profit_manager
+        self.config_store = config_store
+        self.risk_limits = config_store.get(bot_id).get('riskLimits') if config_store else None
+        self.risk_manager = RiskManager(self.risk_limits)
+        self.bot_id = bot_id
+        self.db_path = db_path
         self.active_positions = {}
-        self.strategies = {
-            'Trend Following': self.trend_following_strategy,
-            'Grid Trading': self.grid_trading_strategy,
-            'DCA': self.dca_strategy,
-            'Scalping': self.scalping_strategy,
-            'Mean Reversion': self.mean_reversion_strategy
-        }
+        # All simulated randomness draws from here, seeded per cycle so journals can replay it
+        self.rng = random.Random()
+        self.journal = None
+        # Risk-clock time at the start of the current cycle
+        self.cycle_time = 0.0
+        # Bumped whenever this bot's stored data may have changed, for response caching
+        self.state_version = 0
+        self.strategies = {name: plugin(self) for name, plugin in STRATEGY_REGISTRY.items()}
         
-    async def execute_trading_cycle(self):
+    async def execute_trading_cycle(self, inputs: Optional[MarketInputs] = None, seed: Optional[int] = None):
         """Execute one complete trading cycle"""
         try:
-            logger.info("Executing trading cycle...")
+            logger.info(f"Executing trading cycle for bot {self.bot_id}...")
             
-            # Get current market data
-            market_data = await self.market_data.get_current_prices()
+            seed = random.getrandbits(63) if seed is None else seed
+            self.rng.seed(seed)
+            cycle_time = self.cycle_time = self.risk_manager.clock()
             
-            # Get AI analysis
-            ai_analysis = await self.ai_client.analyze_market(market_data)
+            # Inputs are fetched lazily, so only what the strategy declares is paid for
+            if inputs is None:
+                inputs = MarketInputs(self.market_data, self.ai_client)
             
             # Get current strategy from database
-            strategy = self.get_current_strategy()
+            strategy = self.strategies.get(self.get_current_strategy())
             
             # Execute strategy
-            if strategy in self.strategies:
-                await self.strategies[strategy](market_data, ai_analysis)
+            if strategy:
+                data = await inputs.fetch(strategy.requires)
+                state = strategy.prepare(cycle_time)
+                if self.journal:
+                    self.record_cycle(seed, cycle_time, strategy, data, state)
+                await strategy.run(data)
             
             # Update profit reserves
             await self.profit_manager.update_reserves()
+            await self.profit_manager.check_daily_reserve_transfer()
             
-            logger.info("Trading cycle completed")
+            logger.info(f"Trading cycle completed for bot {self.bot_id}")
             
         except Exception as e:
-            logger.error(f"Error in trading cycle: {e}")
+            logger.error(f"Error in trading cycle for bot {self.bot_id}: {e}")
+        finally:
+            self.mark_changed()
     
-    def get_current_strategy(self) -> str:
-        """Get current trading strategy from database"""
+    def record_cycle(self, seed: int, cycle_time: float, strategy, inputs: Dict, state: Optional[Dict] = None):
+        """Journal everything this cycle consumes, before any order is placed"""
         try:
-            conn = sqlite3.connect('trading_bot.db')
-            cursor = conn.cursor()
-            cursor.execute('SELECT selected_strategy FROM bot_status WHERE id = 1')
-            result = cursor.fetchone()
-            conn.close()
-            return result[0] if result else 'Trend Following'
+            settings = dict(self.config_store.get(self.bot_id)) if self.config_store else {}
+            settings['selectedStrategy'] = strategy.name
+            self.journal.append({
+                'bot_id': self.bot_id,
+                'time': cycle_time,
+                'seed': seed,
+                'settings': settings,
+                'risk': self.risk_manager.export_state(),
+                'strategy': state,
+                'inputs': inputs
+            })
         except Exception as e:
-            logger.error(f"<think>
-I need to continue from where I left off in the trading_engine.py file. I was in the middle of the get_current_strategy method and need to complete that file, then continue with the remaining backend files and complete the artifact.
-</think>
-
-Error getting current strategy: {e}")
-            return 'Trend Following'
+            logger.error(f"Error journaling trading cycle: {e}")
     
-    async def trend_following_strategy(self, market_data: Dict, ai_analysis: Dict):
-        """Trend following strategy implementation"""
-        try:
-            for pair, data in market_data.items():
-                if ai_analysis.get('trend_strength', 0) > 0.7:
-                    if ai_analysis.get('direction') == 'bullish':
-                        await self.execute_buy_order(pair, data['price'], 'trend_following')
-                    elif ai_analysis.get('direction') == 'bearish':
-                        await self.execute_sell_order(pair, data['price'], 'trend_following')
-        except Exception as e:
-            logger.error(f"Error in trend following strategy: {e}")
+    def mark_changed(self):
+        """Invalidate cached API responses for this bot"""
+        self.state_version += 1
     
-    async def grid_trading_strategy(self, market_data: Dict, ai_analysis: Dict):
-        """Grid trading strategy implementation"""
-        try:
-            for pair, data in market_data.items():
-                current_price = data['price']
-                # Simulate grid levels
-                grid_size = current_price * 0.02  # 2% grid
-                
-                if random.random() > 0.7:  # 30% chance to trade
-                    if random.choice([True, False]):
-                        await self.execute_buy_order(pair, current_price - grid_size, 'grid_trading')
-                    else:
-                        await self.execute_sell_order(pair, current_price + grid_size, 'grid_trading')
-        except Exception as e:
-            logger.error(f"Error in grid trading strategy: {e}")
+    def export_state(self) -> Dict:
+        """In-memory state carried across restarts"""
+        return {
+            'active_positions': self.active_positions,
+            'profit_manager': self.profit_manager.export_state(),
+            'risk': self.risk_manager.export_state()
+        }
     
-    async def dca_strategy(self, market_data: Dict, ai_analysis: Dict):
-        """Dollar Cost Averaging strategy implementation"""
-        try:
-            # DCA buys at regular intervals regardless of price
-            for pair, data in market_data.items():
-                if random.random() > 0.8:  # 20% chance to DCA buy
-                    await self.execute_buy_order(pair, data['price'], 'dca')
-        except Exception as e:
-            logger.error(f"Error in DCA strategy: {e}")
+    def restore_state(self, state: Dict):
+        """Restore state written by export_state"""
+        self.active_positions = state.get('active_positions', {})
+        self.profit_manager.restore_state(state.get('profit_manager', {}))
+        self.risk_manager.restore_state(state.get('risk', {}))
     
-    async def scalping_strategy(self, market_data: Dict, ai_analysis: Dict):
-        """Scalping strategy for quick profits"""
-        try:
-            for pair, data in market_data.items():
-                if ai_analysis.get('volatility', 0) > 0.5:
-                    if random.random() > 0.6:  # 40% chance to scalp
-                        side = random.choice(['buy', 'sell'])
-                        if side == 'buy':
-                            await self.execute_buy_order(pair, data['price'], 'scalping')
-                        else:
-                            await self.execute_sell_order(pair, data['price'], 'scalping')
-        except Exception as e:
-            logger.error(f"Error in scalping strategy: {e}")
+    def apply_config(self, config: Dict):
+        """React to a settings change pushed by the config store"""
+        risk_limits = config.get('riskLimits')
+        if risk_limits != self.risk_limits:
+            self.risk_limits = risk_limits
+            self.risk_manager.update_limits(risk_limits or {})
+        self.mark_changed()
     
-    async def mean_reversion_strategy(self, market_data: Dict, ai_analysis: Dict):
-        """Mean reversion strategy implementation"""
+    def get_current_strategy(self) -> str:
+        """Get current trading strategy from the live config, or the database without one"""
+        if self.config_store:
+            return self.config_store.get(self.bot_id).get('selectedStrategy') or 'Trend Following'
+        
         try:
-            for pair, data in market_data.items():
-                if ai_analysis.get('deviation_from_mean', 0) > 0.8:
-                    if ai_analysis.get('price_position') == 'oversold':
-                        await self.execute_buy_order(pair, data['price'], 'mean_reversion')
-                    elif ai_analysis.get('price_position') == 'overbought':
-                        await self.execute_sell_order(pair, data['price'], 'mean_reversion')
+            conn = get_connection(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute('SELECT selected_strategy FROM bot_status WHERE id = ?', (self.bot_id,))
+            result = cursor.fetchone()
+            conn.close()
+            return result[0] if result else 'Trend Following'
         except Exception as e:
-            logger.error(f"Error in mean reversion strategy: {e}")
+            logger.error(f"Error getting current strategy: {e}")
+            return 'Trend Following'
     
-    async def execute_buy_order(self, pair: str, price: float, strategy: str):
-        """Execute a buy order"""
+    async def execute_buy_order(self, pair: str, price: float, strategy: str, amount: Optional[float] = None) -> bool:
+        """Execute a buy order; False if it was rejected or failed"""
         try:
-            amount = random.uniform(0.01, 0.1)  # Random amount for demo
-            profit = random.uniform(5, 50)  # Simulated profit
+            if amount is None:
+                amount = self.rng.uniform(0.01, 0.1)  # Random amount for demo
+            profit = self.rng.uniform(5, 50)  # Simulated profit
+            
+            # Pre-trade risk gate, checked in memory before anything is placed
+            rejection = self.risk_manager.check_order(pair, 'BUY', amount, price)
+            if rejection:
+                logger.warning(f"Rejected BUY order for bot {self.bot_id}: {pair} ({rejection})")
+                return False
             
             # Log trade to database
-            conn = sqlite3.connect('trading_bot.db')
+            conn = get_connection(self.db_path)
             cursor = conn.cursor()
             cursor.execute('''
-                INSERT INTO trades (pair, side, amount, price, profit, strategy, ai_confidence)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (pair, 'BUY', amount, price, profit, strategy, random.uniform(0.7, 0.95)))
+                INSERT INTO trades (pair, side, amount, price, profit, strategy, ai_confidence, bot_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (pair, 'BUY', amount, price, profit, strategy, self.rng.uniform(0.7, 0.95), self.bot_id))
             
             # Update bot status
             cursor.execute('''
                 UPDATE bot_status 
                 SET total_profit = total_profit + ?, active_trades = active_trades + 1
-                WHERE id = 1
-            ''', (profit,))
+                WHERE id = ?
+            ''', (profit, self.bot_id))
             
             conn.commit()
             conn.close()
             
+            self.risk_manager.record_fill(pair, 'BUY', amount, price, profit)
+            
             logger.info(f"Executed BUY order: {pair} @ ${price:.2f}")
+            return True
             
         except Exception as e:
             logger.error(f"Error executing buy order: {e}")
+            return False
     
-    async def execute_sell_order(self, pair: str, price: float, strategy: str):
-        """Execute a sell order"""
+    async def execute_sell_order(self, pair: str, price: float, strategy: str, amount: Optional[float] = None) -> bool:
+        """Execute a sell order; False if it was rejected or failed"""
         try:
-            amount = random.uniform(0.01, 0.1)  # Random amount for demo
-            profit = random.uniform(5, 50)  # Simulated profit
+            if amount is None:
+                amount = self.rng.uniform(0.01, 0.1)  # Random amount for demo
+            profit = self.rng.uniform(5, 50)  # Simulated profit
+            
+            # Pre-trade risk gate, checked in memory before anything is placed
+            rejection = self.risk_manager.check_order(pair, 'SELL', amount, price)
+            if rejection:
+                logger.warning(f"Rejected SELL order for bot {self.bot_id}: {pair} ({rejection})")
+                return False
             
             # Log trade to database
-            conn = sqlite3.connect('trading_bot.db')
+            conn = get_connection(self.db_path)
             cursor = conn.cursor()
             cursor.execute('''
-                INSERT INTO trades (pair, side, amount, price, profit, strategy, ai_confidence)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (pair, 'SELL', amount, price, profit, strategy, random.uniform(0.7, 0.95)))
+                INSERT INTO trades (pair, side, amount, price, profit, strategy, ai_confidence, bot_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (pair, 'SELL', amount, price, profit, strategy, self.rng.uniform(0.7, 0.95), self.bot_id))
             
             # Update bot status
             cursor.execute('''
                 UPDATE bot_status 
                 SET total_profit = total_profit + ?, active_trades = active_trades - 1
-                WHERE id = 1
-            ''', (profit,))
+                WHERE id = ?
+            ''', (profit, self.bot_id))
             
             conn.commit()
             conn.close()
             
+            self.risk_manager.record_fill(pair, 'SELL', amount, price, profit)
+            
             logger.info(f"Executed SELL order: {pair} @ ${price:.2f}")
+            return True
             
         except Exception as e:
             logger.error(f"Error executing sell order: {e}")
+            return False
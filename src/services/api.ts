@@ -7,11 +7,25 @@ const api = axios.create({
   timeout: 10000,
 })
 
+const formatUsd = (value: number) =>
+  `$${value.toLocaleString('en-US', { minimumFractionDigits: 2, maximumFractionDigits: 2 })}`
+
+// The backend returns raw numbers; format them here instead of per request on the server
+const formatTrade = (trade: any) => ({
+  ...trade,
+  amount: String(trade.amount),
+  price: formatUsd(trade.price),
+  profit: trade.profit > 0 ? `+${formatUsd(trade.profit)}` : formatUsd(trade.profit)
+})
+
 export const botAPI = {
   async getStatus() {
     try {
       const response = await api.get('/bot/status')
-      return response.data
+      return {
+        ...response.data,
+        recentTrades: (response.data.recentTrades || []).map(formatTrade)
+      }
     } catch (error) {
       console.error('API Error:', error)
       return {